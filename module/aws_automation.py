@@ -1,7 +1,948 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Instance types offered by the launch forms
+INSTANCE_TYPES = [
+    "t2.micro", "t2.small", "t2.medium",
+    "t3.micro", "t3.small", "t3.medium",
+    "m5.large", "m5.xlarge"
+]
+
+# Example: Amazon Linux 2 AMI in us-east-1
+DEFAULT_AMI_ID = "ami-053b0c53444070a2b"
+
+
+# Approximate on-demand Linux prices (USD/hour, us-east-1) used for savings estimates
+HOURLY_PRICE_USD = {
+    "t2.micro": 0.0116, "t2.small": 0.023, "t2.medium": 0.0464,
+    "t3.micro": 0.0104, "t3.small": 0.0208, "t3.medium": 0.0416,
+    "m5.large": 0.096, "m5.xlarge": 0.192,
+}
+
+# On-disk cache for metrics and catalogs; override with DEVOPSAI_CACHE_DIR
+CACHE_DIR = os.environ.get("DEVOPSAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "devopsai"))
+
+
+# --- Shared AWS clients ---
+
+# boto3 clients are thread-safe once created, but creating them is not, so
+# one client per (service, region) is built under a lock and reused by every worker.
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_aws_client(service, region=None, max_pool_connections=50, max_attempts=10):
+    """Returns a cached client for a service/region with adaptive retries and a larger connection pool.
+
+    max_attempts=1 disables botocore's retries for callers that run their own backoff.
+    """
+    import boto3
+    from botocore.config import Config
+
+    with _clients_lock:
+        if (service, region, max_attempts) not in _clients:
+            _clients[(service, region, max_attempts)] = boto3.session.Session().client(
+                service,
+                region_name=region,
+                config=Config(max_pool_connections=max_pool_connections,
+                              retries={"mode": "adaptive", "max_attempts": max_attempts}),
+            )
+        return _clients[(service, region, max_attempts)]
+
+
+def get_ec2_client(region=None):
+    return get_aws_client("ec2", region)
+
+
+def enabled_regions(client_factory=get_ec2_client):
+    """Lists the regions enabled for this account (opted-in or not requiring opt-in)."""
+    response = client_factory(None).describe_regions(AllRegions=False)
+    return sorted(r["RegionName"] for r in response["Regions"])
+
+
+# --- EC2 Inventory ---
+
+INVENTORY_TTL_SECONDS = 300
+
+
+def describe_region_instances(client, region):
+    """Pages through describe_instances for one region and flattens reservations into rows."""
+    rows = []
+    paginator = client.get_paginator("describe_instances")
+    for page in paginator.paginate(PaginationConfig={"PageSize": 1000}):
+        for reservation in page["Reservations"]:
+            for inst in reservation["Instances"]:
+                tags = {t["Key"]: t["Value"] for t in inst.get("Tags", [])}
+                rows.append({
+                    "InstanceId": inst["InstanceId"],
+                    "Name": tags.get("Name", ""),
+                    "State": inst["State"]["Name"],
+                    "InstanceType": inst["InstanceType"],
+                    "Region": region,
+                    "AvailabilityZone": inst.get("Placement", {}).get("AvailabilityZone", ""),
+                    "VpcId": inst.get("VpcId", ""),
+                    "SubnetId": inst.get("SubnetId", ""),
+                    "PrivateIp": inst.get("PrivateIpAddress", ""),
+                    "PublicIp": inst.get("PublicIpAddress", ""),
+                    "LaunchTime": inst.get("LaunchTime"),
+                    "ImageId": inst.get("ImageId", ""),
+                    "Tags": tags,
+                })
+    return rows
+
+
+class InstanceInventory:
+    """Fleet-wide instance table fetched from all regions in parallel, indexed for fast filtering."""
+    INDEXED_FIELDS = ("State", "InstanceType", "VpcId", "Region")
+
+    def __init__(self, ttl=INVENTORY_TTL_SECONDS, max_workers=16, client_factory=get_ec2_client):
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.client_factory = client_factory
+        self.rows = []
+        self.by_id = {}
+        self.indexes = {field: {} for field in self.INDEXED_FIELDS}
+        self.tag_index = {}
+        self.regions = []
+        self.errors = {}
+        self.fetched_at = 0.0
+        self.fetch_seconds = 0.0
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def refresh(self, regions=None):
+        """Describes every region concurrently and rebuilds the table and its indexes."""
+        started = time.perf_counter()
+        regions = regions or enabled_regions(self.client_factory)
+        # Create the per-region clients up front; the workers then only share thread-safe clients
+        clients = {region: self.client_factory(region) for region in regions}
+        rows, errors = [], {}
+
+        def fetch(region):
+            try:
+                return region, describe_region_instances(clients[region], region), None
+            except Exception as e:
+                return region, [], str(e)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(regions) or 1)) as pool:
+            for region, region_rows, error in pool.map(fetch, regions):
+                rows.extend(region_rows)
+                if error:
+                    errors[region] = error
+
+        indexes = {field: {} for field in self.INDEXED_FIELDS}
+        tag_index = {}
+        for i, row in enumerate(rows):
+            for field in self.INDEXED_FIELDS:
+                indexes[field].setdefault(row[field], set()).add(i)
+            for key, value in row["Tags"].items():
+                tag_index.setdefault((key, None), set()).add(i)
+                tag_index.setdefault((key, value), set()).add(i)
+
+        with self.lock:
+            self.rows = rows
+            self.by_id = {row["InstanceId"]: row for row in rows}
+            self.indexes = indexes
+            self.tag_index = tag_index
+            self.regions = regions
+            self.errors = errors
+            self.fetched_at = time.time()
+            self.fetch_seconds = time.perf_counter() - started
+
+    def ensure_fresh(self, force=False):
+        """Refreshes once the TTL has expired; concurrent callers wait for a single refresh."""
+        if force or self.is_stale():
+            with self.lock:
+                fetched_at = self.fetched_at
+            with self.refresh_lock:
+                # Skip if another caller refreshed while we were waiting for the lock
+                if force or (self.fetched_at == fetched_at and self.is_stale()):
+                    self.refresh()
+
+    def invalidate(self):
+        """Forces the next ensure_fresh() to refetch, e.g. after a bulk action changed the fleet."""
+        with self.lock:
+            self.fetched_at = 0.0
+
+    def values(self, field):
+        with self.lock:
+            return sorted(v for v in self.indexes[field] if v)
+
+    def tag_keys(self):
+        with self.lock:
+            return sorted({key for key, value in self.tag_index if value is None})
+
+    def query(self, tags=None, **filters):
+        """Filters by indexed fields (State=..., InstanceType=..., VpcId=..., Region=...) and tags.
+
+        A tag value of None or "*" matches any instance carrying the key.
+        """
+        with self.lock:
+            candidates = None
+            for field, value in filters.items():
+                if value:
+                    ids = self.indexes[field].get(value, set())
+                    candidates = ids if candidates is None else candidates & ids
+            for key, value in (tags or {}).items():
+                ids = self.tag_index.get((key, None if value in (None, "*") else value), set())
+                candidates = ids if candidates is None else candidates & ids
+            if candidates is None:
+                return list(self.rows)
+            return [self.rows[i] for i in sorted(candidates)]
+
+
+# --- Fleet Launch ---
+
+def split_count(total, buckets):
+    """Splits total into `buckets` near-equal parts, e.g. 10 over 3 subnets -> [4, 3, 3]."""
+    base, extra = divmod(total, buckets)
+    return [base + (1 if i < extra else 0) for i in range(buckets)]
+
+
+def build_tag_specifications(tags):
+    return [{"ResourceType": "instance", "Tags": [{"Key": k, "Value": v} for k, v in tags.items()]}]
+
+
+def launch_fleet(ec2, count, subnet_ids=None, image_id=None, instance_type=None, key_name=None,
+                 security_group_ids=None, launch_template=None, tags=None, allow_partial=True,
+                 use_ec2_fleet=False):
+    """Launches `count` instances with as few API calls as possible.
+
+    Without EC2 Fleet this is one run_instances call per subnet (a single call when no subnet
+    is given) with MinCount/MaxCount covering that subnet's share, and the calls run in parallel.
+    With EC2 Fleet it is a single instant create_fleet request across all subnets, which needs
+    a launch template. Returns (instance_ids, errors).
+    """
+    tags = tags or {}
+    subnet_ids = subnet_ids or [None]
+
+    if use_ec2_fleet:
+        if not launch_template:
+            return [], ["EC2 Fleet requires a launch template."]
+        overrides = []
+        for subnet_id in subnet_ids:
+            override = {}
+            if subnet_id:
+                override["SubnetId"] = subnet_id
+            if instance_type:
+                override["InstanceType"] = instance_type
+            if override:
+                overrides.append(override)
+        config = {"LaunchTemplateSpecification": launch_template}
+        if overrides:
+            config["Overrides"] = overrides
+        request = {
+            "Type": "instant",
+            "LaunchTemplateConfigs": [config],
+            "TargetCapacitySpecification": {"TotalTargetCapacity": count,
+                                            "DefaultTargetCapacityType": "on-demand"},
+        }
+        if tags:
+            request["TagSpecifications"] = build_tag_specifications(tags)
+        response = ec2.create_fleet(**request)
+        instance_ids = [i for group in response.get("Instances", []) for i in group["InstanceIds"]]
+        errors = [f"{e.get('ErrorCode')}: {e.get('ErrorMessage')}" for e in response.get("Errors", [])]
+        return instance_ids, errors
+
+    def launch_share(subnet_id, share):
+        params = {"MinCount": 1 if allow_partial else share, "MaxCount": share}
+        if launch_template:
+            params["LaunchTemplate"] = launch_template
+        if image_id:
+            params["ImageId"] = image_id
+        if instance_type:
+            params["InstanceType"] = instance_type
+        if key_name:
+            params["KeyName"] = key_name
+        if security_group_ids:
+            params["SecurityGroupIds"] = security_group_ids
+        if subnet_id:
+            params["SubnetId"] = subnet_id
+        if tags:
+            params["TagSpecifications"] = build_tag_specifications(tags)
+        try:
+            response = ec2.run_instances(**params)
+            return [i["InstanceId"] for i in response["Instances"]], None
+        except Exception as e:
+            return [], f"{subnet_id or 'default subnet'}: {e}"
+
+    shares = [(subnet, n) for subnet, n in zip(subnet_ids, split_count(count, len(subnet_ids))) if n]
+    instance_ids, errors = [], []
+    with ThreadPoolExecutor(max_workers=len(shares) or 1) as pool:
+        for ids, error in pool.map(lambda share: launch_share(*share), shares):
+            instance_ids.extend(ids)
+            if error:
+                errors.append(error)
+    return instance_ids, errors
+
+
+# --- Instance State Tracker ---
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+class InstanceStateTracker:
+    """Follows instances to a target state (running/terminated) from one background thread.
+
+    Every poll batches up to 1000 instance IDs per describe_instance_status call, and the poll
+    interval backs off exponentially while nothing changes or the API is throttling. Time from
+    request to target state is recorded per instance type and region.
+    """
+    MAX_BATCH = 1000
+
+    def __init__(self, min_delay=2.0, max_delay=60.0, timeout=1800, max_transitions=2000):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.pending = {}
+        self.jobs = {}
+        self.transitions = deque(maxlen=max_transitions)
+        self.durations = []
+        self.errors = deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.job_ids = itertools.count(1)
+
+    def track(self, ec2, instance_ids, target, label, instance_type=None):
+        """Starts following instance_ids until they reach `target`; label names the job. Returns the job id.
+
+        instance_type is one type for all IDs or an {instance_id: type} map; types that are not
+        given are looked up by the background thread, so this call never touches the API.
+        """
+        region = ec2.meta.region_name
+        types = instance_type if isinstance(instance_type, dict) else {}
+        # None marks a type the poll loop still has to resolve
+        default_type = instance_type if isinstance(instance_type, str) else None
+        now = time.time()
+        with self.lock:
+            job_id = next(self.job_ids)
+            self.jobs[job_id] = {"label": label, "ids": list(instance_ids), "target": target, "started": now}
+            for instance_id in instance_ids:
+                self.pending[instance_id] = {
+                    "client": ec2, "region": region, "target": target, "started": now, "state": None,
+                    "type": types.get(instance_id, default_type),
+                    "label": label,
+                }
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True, name="instance-state-tracker")
+                self.thread.start()
+        self.wake.set()
+        return job_id
+
+    def _resolve_types(self, client, instance_ids):
+        """Fills in instance types that were not known when tracking started."""
+        types = {}
+        for page in client.get_paginator("describe_instances").paginate(InstanceIds=instance_ids):
+            for reservation in page["Reservations"]:
+                for inst in reservation["Instances"]:
+                    types[inst["InstanceId"]] = inst["InstanceType"]
+        with self.lock:
+            for instance_id, instance_type in types.items():
+                if instance_id in self.pending:
+                    self.pending[instance_id]["type"] = instance_type
+
+    def _poll(self, client, instance_ids):
+        """Returns {instance_id: state} for one batch of IDs."""
+        states = {}
+        paginator = client.get_paginator("describe_instance_status")
+        for page in paginator.paginate(InstanceIds=instance_ids, IncludeAllInstances=True):
+            for status in page["InstanceStatuses"]:
+                states[status["InstanceId"]] = status["InstanceState"]["Name"]
+        return states
+
+    def _run(self):
+        delay = self.min_delay
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+                groups = {}
+                untyped = {}
+                for instance_id, record in self.pending.items():
+                    groups.setdefault(id(record["client"]), (record["client"], []))[1].append(instance_id)
+                    if record["type"] is None:
+                        untyped.setdefault(id(record["client"]), (record["client"], []))[1].append(instance_id)
+
+            changed, throttled = False, False
+            for client, ids in untyped.values():
+                for i in range(0, len(ids), self.MAX_BATCH):
+                    try:
+                        self._resolve_types(client, ids[i:i + self.MAX_BATCH])
+                    except Exception as e:
+                        # New instances may not be visible yet (eventual consistency); retried next poll
+                        self.errors.append(str(e))
+                        throttled = True
+            for client, ids in groups.values():
+                for i in range(0, len(ids), self.MAX_BATCH):
+                    try:
+                        states = self._poll(client, ids[i:i + self.MAX_BATCH])
+                    except Exception as e:
+                        # Includes throttling and InvalidInstanceID.NotFound right after launch
+                        # (eventual consistency); both are retried after backing off.
+                        self.errors.append(str(e))
+                        throttled = True
+                        continue
+                    changed |= self._apply(states)
+            self._expire()
+
+            delay = self.min_delay if changed and not throttled else min(delay * 2, self.max_delay)
+            self.wake.wait(delay)
+            if self.wake.is_set():
+                self.wake.clear()
+                delay = self.min_delay
+
+    def _apply(self, states):
+        now = time.time()
+        changed = False
+        with self.lock:
+            for instance_id, state in states.items():
+                record = self.pending.get(instance_id)
+                if record is None or record["state"] == state:
+                    continue
+                changed = True
+                self.transitions.append({"Time": time.strftime("%H:%M:%S", time.localtime(now)),
+                                         "InstanceId": instance_id, "From": record["state"] or "-",
+                                         "To": state, "Job": record["label"]})
+                record["state"] = state
+                if state == record["target"]:
+                    self.durations.append({"Target": state, "InstanceType": record["type"] or "unknown",
+                                           "Region": record["region"], "Seconds": now - record["started"]})
+                    del self.pending[instance_id]
+        return changed
+
+    def _expire(self):
+        now = time.time()
+        with self.lock:
+            for instance_id in [i for i, r in self.pending.items() if now - r["started"] > self.timeout]:
+                record = self.pending.pop(instance_id)
+                self.errors.append(f"{instance_id} did not reach '{record['target']}' "
+                                   f"within {self.timeout}s (last state: {record['state']})")
+
+    def job_summaries(self):
+        with self.lock:
+            rows = []
+            for job in self.jobs.values():
+                waiting = sum(1 for i in job["ids"] if i in self.pending)
+                rows.append({"Job": job["label"], "Target": job["target"], "Instances": len(job["ids"]),
+                             "Done": len(job["ids"]) - waiting, "Waiting": waiting,
+                             "Elapsed (s)": round(time.time() - job["started"], 1)})
+            return rows[::-1]
+
+    def latency_stats(self):
+        """Time-to-running / time-to-terminated distribution per (target, instance type, region)."""
+        with self.lock:
+            groups = {}
+            for d in self.durations:
+                groups.setdefault((d["Target"], d["InstanceType"], d["Region"]), []).append(d["Seconds"])
+        rows = []
+        for (target, itype, region), values in sorted(groups.items()):
+            values.sort()
+            rows.append({"Target": target, "InstanceType": itype, "Region": region, "Count": len(values),
+                         "p50 (s)": round(percentile(values, 50), 1), "p90 (s)": round(percentile(values, 90), 1),
+                         "Max (s)": round(values[-1], 1)})
+        return rows
+
+
+def shared_tracker():
+    """Factory for the process-wide state tracker; wrapped in st.cache_resource by the page."""
+    return InstanceStateTracker()
+
+
+# --- Cost & Utilization ---
+
+# (metric name, statistic) pulled for every instance
+UTILIZATION_METRICS = [
+    ("CPUUtilization", "Average"),
+    ("NetworkIn", "Sum"),
+    ("NetworkOut", "Sum"),
+    ("EBSReadBytes", "Sum"),
+    ("EBSWriteBytes", "Sum"),
+]
+MAX_QUERIES_PER_CALL = 500
+
+
+def fetch_metric_values(cloudwatch, instance_ids, start, end, period):
+    """Fetches every UTILIZATION_METRICS series for instance_ids with batched GetMetricData calls.
+
+    Up to 500 queries (100 instances x 5 metrics) go into each call. Returns {(instance_id, metric): [values]}.
+    """
+    queries, keys = [], {}
+    for i, instance_id in enumerate(instance_ids):
+        for j, (metric, stat) in enumerate(UTILIZATION_METRICS):
+            query_id = f"q{i}_{j}"
+            keys[query_id] = (instance_id, metric)
+            queries.append({
+                "Id": query_id,
+                "MetricStat": {
+                    "Metric": {"Namespace": "AWS/EC2", "MetricName": metric,
+                               "Dimensions": [{"Name": "InstanceId", "Value": instance_id}]},
+                    "Period": period,
+                    "Stat": stat,
+                },
+                "ReturnData": True,
+            })
+
+    values = {key: [] for key in keys.values()}
+    paginator = cloudwatch.get_paginator("get_metric_data")
+    for i in range(0, len(queries), MAX_QUERIES_PER_CALL):
+        for page in paginator.paginate(MetricDataQueries=queries[i:i + MAX_QUERIES_PER_CALL],
+                                       StartTime=start, EndTime=end, ScanBy="TimestampAscending"):
+            for result in page["MetricDataResults"]:
+                values[keys[result["Id"]]].extend(result["Values"])
+    return values
+
+
+def smaller_instance_type(instance_type):
+    """Next smaller type of the same family among the launcher's INSTANCE_TYPES, if any."""
+    family = instance_type.split(".")[0]
+    same_family = [t for t in INSTANCE_TYPES if t.split(".")[0] == family]
+    if instance_type in same_family and same_family.index(instance_type) > 0:
+        return same_family[same_family.index(instance_type) - 1]
+    return None
+
+
+def larger_instance_type(instance_type):
+    family = instance_type.split(".")[0]
+    same_family = [t for t in INSTANCE_TYPES if t.split(".")[0] == family]
+    if instance_type in same_family and same_family.index(instance_type) < len(same_family) - 1:
+        return same_family[same_family.index(instance_type) + 1]
+    return None
+
+
+def utilization_stats(instances, hours=24, period=3600, max_workers=8, client_factory=None):
+    """Returns ({instance_id: {metric: [p50, p95, max]}}, from_cache) for inventory rows.
+
+    The window end is rounded down to `period`, so repeated views inside the same window are
+    served from the JSON cache in CACHE_DIR instead of CloudWatch.
+    """
+    import numpy as np
+    from datetime import datetime, timezone
+
+    client_factory = client_factory or (lambda region: get_aws_client("cloudwatch", region))
+    end_ts = int(time.time()) // period * period
+    start_ts = end_ts - hours * 3600
+    ids = sorted(row["InstanceId"] for row in instances)
+    digest = hashlib.sha1(f"{start_ts}:{end_ts}:{period}:{','.join(ids)}".encode()).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, "utilization", f"{digest}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f), True
+
+    start = datetime.fromtimestamp(start_ts, timezone.utc)
+    end = datetime.fromtimestamp(end_ts, timezone.utc)
+    by_region = {}
+    for row in instances:
+        by_region.setdefault(row["Region"], []).append(row["InstanceId"])
+    # One job per (region, chunk of 100 instances) so large fleets fan out across the pool
+    per_call = MAX_QUERIES_PER_CALL // len(UTILIZATION_METRICS)
+    jobs = [(region, region_ids[i:i + per_call])
+            for region, region_ids in by_region.items() for i in range(0, len(region_ids), per_call)]
+    values = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for result in pool.map(lambda job: fetch_metric_values(client_factory(job[0]), job[1],
+                                                               start, end, period), jobs):
+            values.update(result)
+
+    # One NaN-padded (instances x samples) matrix per metric, so the percentiles of the
+    # whole fleet are a single vectorized call
+    n_samples = max((len(v) for v in values.values()), default=0)
+    stats = {instance_id: {} for instance_id in ids}
+    for metric, _ in UTILIZATION_METRICS:
+        matrix = np.full((len(ids), max(n_samples, 1)), np.nan)
+        for i, instance_id in enumerate(ids):
+            series = values.get((instance_id, metric), [])
+            matrix[i, :len(series)] = series
+        has_data = ~np.isnan(matrix).all(axis=1)
+        pct = np.full((3, len(ids)), np.nan)
+        if has_data.any():
+            pct[:, has_data] = np.nanpercentile(matrix[has_data], [50, 95, 100], axis=1)
+        for i, instance_id in enumerate(ids):
+            stats[instance_id][metric] = [None if np.isnan(x) else float(x) for x in pct[:, i]]
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+    return stats, False
+
+
+def rightsizing_report(instances, stats, period=3600, low_cpu=20.0, high_cpu=80.0, idle_cpu=5.0):
+    """Turns utilization stats into one row per instance with a right-sizing recommendation."""
+    per_hour = 3600 / period
+    rows = []
+    for row in instances:
+        metrics = stats.get(row["InstanceId"], {})
+        cpu_p50, cpu_p95, cpu_max = metrics.get("CPUUtilization", [None] * 3)
+        p95 = {metric: (metrics.get(metric) or [None] * 3)[1] or 0.0 for metric, _ in UTILIZATION_METRICS}
+        net_p95 = (p95["NetworkIn"] + p95["NetworkOut"]) * per_hour / 1e6
+        disk_p95 = (p95["EBSReadBytes"] + p95["EBSWriteBytes"]) * per_hour / 1e6
+        itype = row["InstanceType"]
+        advice, target = "OK", None
+        if cpu_p95 is None:
+            advice = "No data"
+        elif cpu_p95 < idle_cpu and net_p95 < 1:
+            advice = "Idle: stop or terminate"
+        elif cpu_p95 < low_cpu:
+            target = smaller_instance_type(itype)
+            advice = f"Downsize to {target}" if target else "Underutilized"
+        elif cpu_p95 > high_cpu:
+            target = larger_instance_type(itype)
+            advice = f"Upsize to {target}" if target else "Overutilized"
+        monthly_delta = None
+        if itype in HOURLY_PRICE_USD:
+            if advice.startswith("Idle"):
+                monthly_delta = -HOURLY_PRICE_USD[itype] * 730
+            elif target in HOURLY_PRICE_USD:
+                monthly_delta = (HOURLY_PRICE_USD[target] - HOURLY_PRICE_USD[itype]) * 730
+        rows.append({
+            "InstanceId": row["InstanceId"], "Name": row["Name"], "InstanceType": itype, "Region": row["Region"],
+            "CPU p50 %": None if cpu_p50 is None else round(cpu_p50, 1),
+            "CPU p95 %": None if cpu_p95 is None else round(cpu_p95, 1),
+            "CPU max %": None if cpu_max is None else round(cpu_max, 1),
+            "Network p95 (MB/h)": round(net_p95, 2),
+            "Disk p95 (MB/h)": round(disk_p95, 2),
+            "Recommendation": advice,
+            "Monthly Delta ($)": None if monthly_delta is None else round(monthly_delta, 2),
+        })
+    return rows
+
+
+# --- AMI & Instance-Type Catalog ---
+
+# Public AMI families synced alongside the account's own images: (owner, name pattern)
+POPULAR_AMI_FILTERS = [
+    ("amazon", "al2023-ami-2023.*-x86_64"),
+    ("amazon", "al2023-ami-2023.*-arm64"),
+    ("amazon", "amzn2-ami-hvm-*-x86_64-gp2"),
+    ("099720109477", "ubuntu/images/hvm-ssd*/ubuntu-*-22.04-amd64-server-*"),
+    ("099720109477", "ubuntu/images/hvm-ssd*/ubuntu-*-24.04-amd64-server-*"),
+    ("amazon", "Windows_Server-2022-English-Full-Base-*"),
+]
+CATALOG_MAX_AGE_SECONDS = 24 * 3600
+
+
+class CatalogStore:
+    """SQLite-backed catalog of AMIs and instance types per region, synced in the background.
+
+    Launch forms query the local store, so searching and validating never calls the EC2 API.
+    """
+    def __init__(self, path=None, max_workers=8, client_factory=get_ec2_client):
+        self.path = path or os.path.join(CACHE_DIR, "ec2_catalog.db")
+        self.max_workers = max_workers
+        self.client_factory = client_factory
+        self.sync_thread = None
+        self.sync_error = ""
+        self.last_attempt = 0.0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS images (
+                    region TEXT, image_id TEXT, name TEXT, description TEXT, owner TEXT,
+                    architecture TEXT, platform TEXT, creation_date TEXT,
+                    PRIMARY KEY (region, image_id));
+                CREATE INDEX IF NOT EXISTS images_name ON images (region, name);
+                CREATE TABLE IF NOT EXISTS instance_types (
+                    region TEXT, instance_type TEXT, vcpus INTEGER, memory_mib INTEGER,
+                    architectures TEXT, current_generation INTEGER,
+                    PRIMARY KEY (region, instance_type));
+                CREATE TABLE IF NOT EXISTS sync_state (region TEXT PRIMARY KEY, synced_at REAL,
+                    images INTEGER, instance_types INTEGER);
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # sqlite3's own context manager only commits or rolls back; the connection is closed here
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def fetch_region(client, region):
+        """Pulls owned and popular public AMIs plus all offered instance types for one region."""
+        images = {}
+        requests = [{"Owners": ["self"]}] + [
+            {"Owners": [owner], "Filters": [{"Name": "name", "Values": [pattern]},
+                                            {"Name": "state", "Values": ["available"]}]}
+            for owner, pattern in POPULAR_AMI_FILTERS
+        ]
+        for request in requests:
+            for page in client.get_paginator("describe_images").paginate(**request):
+                for img in page["Images"]:
+                    images[img["ImageId"]] = (
+                        region, img["ImageId"], img.get("Name", ""), img.get("Description", ""),
+                        img.get("ImageOwnerAlias") or img.get("OwnerId", ""), img.get("Architecture", ""),
+                        img.get("PlatformDetails", ""), img.get("CreationDate", ""),
+                    )
+        types = []
+        for page in client.get_paginator("describe_instance_types").paginate():
+            for it in page["InstanceTypes"]:
+                types.append((
+                    region, it["InstanceType"], it["VCpuInfo"]["DefaultVCpus"], it["MemoryInfo"]["SizeInMiB"],
+                    ",".join(it.get("ProcessorInfo", {}).get("SupportedArchitectures", [])),
+                    int(it.get("CurrentGeneration", False)),
+                ))
+        return region, list(images.values()), types
+
+    def sync(self, regions=None):
+        """Fetches every region concurrently, then replaces each region's rows in one transaction."""
+        regions = regions or enabled_regions(self.client_factory)
+        clients = {region: self.client_factory(region) for region in regions}
+        errors = []
+
+        def fetch(region):
+            try:
+                return self.fetch_region(clients[region], region)
+            except Exception as e:
+                errors.append(f"{region}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = [r for r in pool.map(fetch, regions) if r]
+        with self._connect() as conn:
+            for region, images, types in results:
+                conn.execute("DELETE FROM images WHERE region = ?", (region,))
+                conn.execute("DELETE FROM instance_types WHERE region = ?", (region,))
+                conn.executemany("INSERT INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)", images)
+                conn.executemany("INSERT INTO instance_types VALUES (?, ?, ?, ?, ?, ?)", types)
+                conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                             (region, time.time(), len(images), len(types)))
+        self.sync_error = "; ".join(errors)
+
+    def sync_in_background(self, force=False):
+        """Starts a sync thread if the catalog is older than CATALOG_MAX_AGE_SECONDS (or forced)."""
+        with self.lock:
+            if self.sync_thread and self.sync_thread.is_alive():
+                return False
+            if not force:
+                last = self.last_synced()
+                if last and time.time() - last < CATALOG_MAX_AGE_SECONDS:
+                    return False
+                # Don't hammer the API every rerun while syncs keep failing (e.g. missing permissions)
+                if time.time() - self.last_attempt < 900:
+                    return False
+            self.last_attempt = time.time()
+
+            def target():
+                try:
+                    self.sync()
+                except Exception as e:
+                    self.sync_error = str(e)
+
+            self.sync_thread = threading.Thread(target=target, daemon=True, name="ec2-catalog-sync")
+            self.sync_thread.start()
+            return True
+
+    def is_syncing(self):
+        return bool(self.sync_thread and self.sync_thread.is_alive())
+
+    def last_synced(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT MIN(synced_at) FROM sync_state").fetchone()[0]
+
+    def status(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT region, synced_at, images, instance_types FROM sync_state "
+                                "ORDER BY region").fetchall()
+        return [{"Region": r, "Synced": time.strftime("%Y-%m-%d %H:%M", time.localtime(t)),
+                 "AMIs": i, "Instance Types": n} for r, t, i, n in rows]
+
+    @staticmethod
+    def _like(text):
+        """Escapes LIKE wildcards so '_' and '%' in user text match literally (used with ESCAPE '\\')."""
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def search_images(self, region, text="", limit=50):
+        text = self._like(text)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT image_id, name, owner, architecture, platform, creation_date FROM images "
+                "WHERE region = ? AND (name LIKE ? ESCAPE '\\' OR image_id LIKE ? ESCAPE '\\' "
+                "OR description LIKE ? ESCAPE '\\') "
+                "ORDER BY creation_date DESC LIMIT ?",
+                (region, f"%{text}%", f"{text}%", f"%{text}%", limit)).fetchall()
+        return [dict(zip(("ImageId", "Name", "Owner", "Architecture", "Platform", "Created"), r)) for r in rows]
+
+    def get_image(self, region, image_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT image_id, name, owner, architecture, platform, creation_date FROM images "
+                "WHERE region = ? AND image_id = ?", (region, image_id)).fetchone()
+        return dict(zip(("ImageId", "Name", "Owner", "Architecture", "Platform", "Created"), row)) if row else None
+
+    def search_instance_types(self, region, min_vcpus=0, min_memory_gib=0.0, text="", limit=200):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT instance_type, vcpus, memory_mib, architectures, current_generation FROM instance_types "
+                "WHERE region = ? AND vcpus >= ? AND memory_mib >= ? AND instance_type LIKE ? ESCAPE '\\' "
+                "ORDER BY vcpus, memory_mib, instance_type LIMIT ?",
+                (region, min_vcpus, int(min_memory_gib * 1024), f"{self._like(text)}%", limit)).fetchall()
+        return [{"InstanceType": t, "vCPUs": v, "Memory (GiB)": round(m / 1024, 2), "Architectures": a,
+                 "Current Gen": bool(c)} for t, v, m, a, c in rows]
+
+    def get_instance_type(self, region, instance_type):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT instance_type, vcpus, memory_mib, architectures, current_generation FROM instance_types "
+                "WHERE region = ? AND instance_type = ?", (region, instance_type)).fetchone()
+        if row is None:
+            return None
+        t, v, m, a, c = row
+        return {"InstanceType": t, "vCPUs": v, "Memory (GiB)": round(m / 1024, 2), "Architectures": a,
+                "Current Gen": bool(c)}
+
+    def has_region(self, region):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM sync_state WHERE region = ?", (region,)).fetchone() is not None
+
+
+# --- Bulk Tag-Based Actions ---
+
+# Every EC2 action used below accepts at most 1000 instance IDs / resources per call
+BULK_CHUNK_SIZE = 1000
+THROTTLING_CODES = {"RequestLimitExceeded", "Throttling", "ThrottlingException"}
+# action -> (EC2 operation, state the instances are tracked to afterwards)
+BULK_ACTIONS = {
+    "stop": ("stop_instances", "stopped"),
+    "start": ("start_instances", "running"),
+    "reboot": ("reboot_instances", None),
+    "terminate": ("terminate_instances", "terminated"),
+    "retag": ("create_tags", None),
+}
+
+
+# Instances in these states accept none of the bulk actions
+GONE_STATES = {"shutting-down", "terminated"}
+
+
+def plan_bulk_action(rows, action):
+    """Groups target instances by region into API-sized chunks: [(region, [instance_ids])].
+
+    Instances already in the action's target state (e.g. stopped for stop) or already gone are left out.
+    """
+    target_state = BULK_ACTIONS[action][1]
+    by_region = {}
+    for row in rows:
+        if row["State"] == target_state or row["State"] in GONE_STATES:
+            continue
+        by_region.setdefault(row["Region"], []).append(row["InstanceId"])
+    return [(region, ids[i:i + BULK_CHUNK_SIZE])
+            for region, ids in sorted(by_region.items()) for i in range(0, len(ids), BULK_CHUNK_SIZE)]
+
+
+def call_with_backoff(func, max_attempts=8, base_delay=0.5, **kwargs):
+    """Calls an EC2 operation, retrying throttling errors with exponential backoff and full jitter.
+
+    Returns (response, attempts).
+    """
+    from botocore.exceptions import ClientError
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return func(**kwargs), attempt
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in THROTTLING_CODES or attempt == max_attempts:
+                raise
+            time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+
+
+def get_bulk_ec2_client(region):
+    """EC2 client without botocore retries; bulk calls retry throttling once, in call_with_backoff."""
+    return get_aws_client("ec2", region, max_attempts=1)
+
+
+def run_bulk_action(plan, action, tags=None, dry_run=False, max_workers=8, client_factory=get_bulk_ec2_client):
+    """Executes a plan: regions run concurrently, chunks within a region run one after another.
+
+    With dry_run=True every call is sent with DryRun=True, so EC2 checks permissions without acting.
+    Returns one result row per chunk.
+    """
+    from botocore.exceptions import ClientError
+
+    operation, _ = BULK_ACTIONS[action]
+    by_region = {}
+    for region, ids in plan:
+        by_region.setdefault(region, []).append(ids)
+    clients = {region: client_factory(region) for region in by_region}
+
+    def run_region(region):
+        rows = []
+        for ids in by_region[region]:
+            kwargs = {"DryRun": dry_run}
+            if action == "retag":
+                kwargs.update(Resources=ids, Tags=[{"Key": k, "Value": v} for k, v in (tags or {}).items()])
+            else:
+                kwargs["InstanceIds"] = ids
+            started = time.perf_counter()
+            row = {"Region": region, "Action": action, "Instances": len(ids), "Result": "ok",
+                   "Attempts": 1, "Latency (s)": 0.0, "InstanceIds": ids}
+            try:
+                _, row["Attempts"] = call_with_backoff(getattr(clients[region], operation), **kwargs)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                # A dry run that would have succeeded is reported as DryRunOperation
+                if code == "DryRunOperation":
+                    row["Result"] = "dry run ok"
+                else:
+                    row["Result"] = f"{code}: {e.response['Error'].get('Message')}"
+            except Exception as e:
+                row["Result"] = str(e)
+            row["Latency (s)"] = round(time.perf_counter() - started, 2)
+            rows.append(row)
+        return rows
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for rows in pool.map(run_region, sorted(by_region)):
+            results.extend(rows)
+    return results
+
+
+def shared_catalog():
+    """Factory for the process-wide catalog; wrapped in st.cache_resource by the page."""
+    return CatalogStore()
+
+
+def shared_inventory():
+    """Factory for the process-wide inventory; wrapped in st.cache_resource by the page."""
+    return InstanceInventory()
+
+
+def parse_tag_filter(text):
+    """Parses "Env=prod, Team=*, Owner" into a {key: value} filter."""
+    tags = {}
+    for part in text.split(","):
+        if part.strip():
+            key, _, value = part.partition("=")
+            tags[key.strip()] = value.strip() or None
+    return tags
+
+
 def run():
     import streamlit as st
     import boto3
-    from botocore.exceptions import ClientError
+    from botocore.exceptions import BotoCoreError, ClientError
 
     # --- AWS Configuration (IMPORTANT: Best practice is to use IAM Roles) ---
     # If running on an EC2 instance with an appropriate IAM Role,
@@ -16,139 +957,461 @@ def run():
 
 
     st.title("🚀 EC2 Instance Manager")
-    st.write("Launch and terminate Amazon EC2 instances directly from this app.")
-
-    # --- Section for Launching Instances ---
-    st.header("Launch New Instance")
-
-    instance_name = st.text_input("Instance Name Tag", "MyStreamlitInstance", key="launch_name")
-    instance_type = st.selectbox(
-        "Instance Type",
-        [
-            "t2.micro", "t2.small", "t2.medium",
-            "t3.micro", "t3.small", "t3.medium",
-            "m5.large", "m5.xlarge"
-        ],
-        index=0, # Default to t2.micro
-        key="launch_type"
-    )
-
-    # You'll need to find a suitable AMI ID for your region.
-    # This is a common Amazon Linux 2 AMI ID for us-east-1 (N. Virginia).
-    # Always verify the correct AMI ID for your chosen region and OS.
-    ami_id = st.text_input(
-        "AMI ID (Amazon Machine Image)",
-        "ami-053b0c53444070a2b", # Example: Amazon Linux 2 AMI in us-east-1
-        key="launch_ami"
-    )
-
-    key_pair_name = st.text_input("Key Pair Name (for SSH access)", "", key="launch_keypair")
-    st.info("Ensure this Key Pair exists in your AWS account and region.")
-
-    security_group_ids_input_launch = st.text_input(
-        "Security Group IDs (comma-separated)",
-        "sg-xxxxxxxxxxxxxxxxx", # Replace with your actual Security Group ID
-        key="launch_sg_ids"
-    )
-    st.info("Separate multiple IDs with a comma (e.g., sg-xxxx,sg-yyyy).")
-
-    if st.button("Launch EC2 Instance", key="launch_button"):
-        if not key_pair_name:
-            st.error("Please provide a Key Pair Name.")
-        elif not security_group_ids_input_launch:
-            st.error("Please provide at least one Security Group ID.")
-        else:
-            security_group_ids_launch = [sg.strip() for sg in security_group_ids_input_launch.split(',')]
-            
-            st.write("Attempting to launch instance...")
-            try:
-                with st.spinner("Launching... This may take a moment."):
-                    response = ec2.run_instances(
-                        ImageId=ami_id,
-                        MinCount=1,
-                        MaxCount=1,
-                        InstanceType=instance_type,
-                        KeyName=key_pair_name,
-                        SecurityGroupIds=security_group_ids_launch,
-                        TagSpecifications=[
-                            {
-                                'ResourceType': 'instance',
-                                'Tags': [
-                                    {
-                                        'Key': 'Name',
-                                        'Value': instance_name
-                                    },
-                                    {
-                                        'Key': 'CreatedBy',
-                                        'Value': 'StreamlitApp'
-                                    }
-                                ]
-                            }
-                        ]
-                    )
 
-                instance_id = response['Instances'][0]['InstanceId']
-                st.success(f"Instance '{instance_name}' ({instance_type}) launched successfully!")
-                st.write(f"**Instance ID:** `{instance_id}`")
-                st.write(f"You can monitor its status in the AWS EC2 console.")
+    section = st.sidebar.radio("☁️ Select a section", [
+        "Launch & Terminate",
+        "Inventory",
+        "Fleet Launch",
+        "Instance Tracker",
+        "Cost & Utilization",
+        "AMI & Type Catalog",
+        "Bulk Actions",
+    ])
 
-                st.subheader("Launched Instance Details:")
-                st.json(response['Instances'][0])
-
-            except ClientError as e:
-                error_code = e.response.get("Error", {}).get("Code")
-                error_message = e.response.get("Error", {}).get("Message")
-                st.error(f"Error launching instance: `{error_code}` - {error_message}")
-                st.warning("Please check your AWS credentials, AMI ID, Key Pair, Security Group IDs, and region.")
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {e}")
+    # Shared by all sessions; refreshed at most once per TTL
+    inventory = st.cache_resource(shared_inventory)()
+    tracker = st.cache_resource(shared_tracker)()
+    catalog = st.cache_resource(shared_catalog)()
+    # Keeps the local AMI/type catalog fresh without blocking the page
+    catalog.sync_in_background()
+    region = ec2.meta.region_name
 
-    st.markdown("---")
+    # ---------- SECTION: LAUNCH & TERMINATE ----------
+    if section == "Launch & Terminate":
+        st.write("Launch and terminate Amazon EC2 instances directly from this app.")
 
-    # --- Section for Terminating Instances ---
-    st.header("Terminate Existing Instance(s)")
+        # --- Section for Launching Instances ---
+        st.header("Launch New Instance")
 
-    instance_ids_to_terminate_input = st.text_input(
-        "Instance ID(s) to Terminate (comma-separated)",
-        "",
-        key="terminate_ids"
-    )
-    st.warning("Terminating instances is irreversible. Please double-check the Instance IDs.")
+        instance_name = st.text_input("Instance Name Tag", "MyStreamlitInstance", key="launch_name")
+        instance_type = st.selectbox(
+            "Instance Type",
+            INSTANCE_TYPES,
+            index=0, # Default to t2.micro
+            key="launch_type"
+        )
 
-    if st.button("Terminate EC2 Instance(s)", key="terminate_button"):
-        if not instance_ids_to_terminate_input:
-            st.error("Please enter at least one Instance ID to terminate.")
+        # You'll need to find a suitable AMI ID for your region.
+        # This is a common Amazon Linux 2 AMI ID for us-east-1 (N. Virginia).
+        # Always verify the correct AMI ID for your chosen region and OS.
+        ami_search = st.text_input("Search AMIs in the local catalog (name or ID)", "", key="launch_ami_search")
+        picked = None
+        if ami_search:
+            matches = catalog.search_images(region, ami_search, limit=20)
+            if matches:
+                picked = st.selectbox("Matching AMIs", matches, key="launch_ami_pick",
+                                      format_func=lambda img: f"{img['ImageId']} — {img['Name']}")
+            else:
+                st.caption("No matching AMIs in the catalog.")
+        if picked:
+            ami_id = picked["ImageId"]
         else:
-            instance_ids_to_terminate = [
-                i.strip() for i in instance_ids_to_terminate_input.split(',') if i.strip()
-            ]
+            ami_id = st.text_input(
+                "AMI ID (Amazon Machine Image)",
+                DEFAULT_AMI_ID,
+                key="launch_ami"
+            )
+        if catalog.has_region(region):
+            image = catalog.get_image(region, ami_id)
+            itype = catalog.get_instance_type(region, instance_type)
+            if image:
+                st.caption(f"✅ {image['Name']} ({image['Architecture']}, {image['Owner']})")
+            else:
+                st.warning(f"AMI `{ami_id}` is not in the {region} catalog (it may be private to another "
+                           "account or from a different region).")
+            if itype:
+                st.caption(f"✅ {instance_type}: {itype['vCPUs']} vCPU, {itype['Memory (GiB)']} GiB")
+            else:
+                st.warning(f"Instance type `{instance_type}` is not offered in {region}.")
+
+        key_pair_name = st.text_input("Key Pair Name (for SSH access)", "", key="launch_keypair")
+        st.info("Ensure this Key Pair exists in your AWS account and region.")
 
-            if not instance_ids_to_terminate:
-                st.error("No valid Instance IDs entered for termination.")
+        security_group_ids_input_launch = st.text_input(
+            "Security Group IDs (comma-separated)",
+            "sg-xxxxxxxxxxxxxxxxx", # Replace with your actual Security Group ID
+            key="launch_sg_ids"
+        )
+        st.info("Separate multiple IDs with a comma (e.g., sg-xxxx,sg-yyyy).")
+
+        if st.button("Launch EC2 Instance", key="launch_button"):
+            if not key_pair_name:
+                st.error("Please provide a Key Pair Name.")
+            elif not security_group_ids_input_launch:
+                st.error("Please provide at least one Security Group ID.")
             else:
-                st.write(f"Attempting to terminate: {', '.join(instance_ids_to_terminate)}")
+                security_group_ids_launch = [sg.strip() for sg in security_group_ids_input_launch.split(',')]
+            
+                st.write("Attempting to launch instance...")
                 try:
-                    with st.spinner("Terminating..."):
-                        response = ec2.terminate_instances(InstanceIds=instance_ids_to_terminate)
-                    
-                    terminated_instances = response.get('TerminatingInstances', [])
-                    
-                    if terminated_instances:
-                        st.success("Successfully initiated termination for the following instances:")
-                        for instance in terminated_instances:
-                            st.write(f"- `{instance['InstanceId']}` (Current State: {instance['CurrentState']['Name']})")
-                        st.info("It may take a few minutes for instances to fully terminate.")
-                        st.json(terminated_instances)
-                    else:
-                        st.warning("No instances were listed as terminating. Check IDs and permissions.")
+                    with st.spinner("Launching... This may take a moment."):
+                        response = ec2.run_instances(
+                            ImageId=ami_id,
+                            MinCount=1,
+                            MaxCount=1,
+                            InstanceType=instance_type,
+                            KeyName=key_pair_name,
+                            SecurityGroupIds=security_group_ids_launch,
+                            TagSpecifications=[
+                                {
+                                    'ResourceType': 'instance',
+                                    'Tags': [
+                                        {
+                                            'Key': 'Name',
+                                            'Value': instance_name
+                                        },
+                                        {
+                                            'Key': 'CreatedBy',
+                                            'Value': 'StreamlitApp'
+                                        }
+                                    ]
+                                }
+                            ]
+                        )
+
+                    instance_id = response['Instances'][0]['InstanceId']
+                    st.success(f"Instance '{instance_name}' ({instance_type}) launched successfully!")
+                    st.write(f"**Instance ID:** `{instance_id}`")
+                    tracker.track(ec2, [instance_id], "running", f"{instance_name} @ {time.strftime('%H:%M:%S')}",
+                                  instance_type=instance_type)
+                    st.write("Its progress to `running` is tracked in the **Instance Tracker** section.")
+
+                    st.subheader("Launched Instance Details:")
+                    st.json(response['Instances'][0])
 
                 except ClientError as e:
                     error_code = e.response.get("Error", {}).get("Code")
                     error_message = e.response.get("Error", {}).get("Message")
-                    st.error(f"Error terminating instance(s): `{error_code}` - {error_message}")
-                    st.warning("Please check your AWS credentials, Instance IDs, and region.")
+                    st.error(f"Error launching instance: `{error_code}` - {error_message}")
+                    st.warning("Please check your AWS credentials, AMI ID, Key Pair, Security Group IDs, and region.")
                 except Exception as e:
                     st.error(f"An unexpected error occurred: {e}")
 
+        st.markdown("---")
+
+        # --- Section for Terminating Instances ---
+        st.header("Terminate Existing Instance(s)")
+
+        instance_ids_to_terminate_input = st.text_input(
+            "Instance ID(s) to Terminate (comma-separated)",
+            "",
+            key="terminate_ids"
+        )
+        st.warning("Terminating instances is irreversible. Please double-check the Instance IDs.")
+
+        if st.button("Terminate EC2 Instance(s)", key="terminate_button"):
+            if not instance_ids_to_terminate_input:
+                st.error("Please enter at least one Instance ID to terminate.")
+            else:
+                instance_ids_to_terminate = [
+                    i.strip() for i in instance_ids_to_terminate_input.split(',') if i.strip()
+                ]
+
+                if not instance_ids_to_terminate:
+                    st.error("No valid Instance IDs entered for termination.")
+                else:
+                    st.write(f"Attempting to terminate: {', '.join(instance_ids_to_terminate)}")
+                    try:
+                        with st.spinner("Terminating..."):
+                            response = ec2.terminate_instances(InstanceIds=instance_ids_to_terminate)
+                    
+                        terminated_instances = response.get('TerminatingInstances', [])
+                    
+                        if terminated_instances:
+                            st.success("Successfully initiated termination for the following instances:")
+                            for instance in terminated_instances:
+                                st.write(f"- `{instance['InstanceId']}` (Current State: {instance['CurrentState']['Name']})")
+                            st.info("It may take a few minutes for instances to fully terminate. "
+                                    "Progress is tracked in the **Instance Tracker** section.")
+                            tracker.track(ec2, [i["InstanceId"] for i in terminated_instances], "terminated",
+                                          f"terminate {len(terminated_instances)} @ {time.strftime('%H:%M:%S')}")
+                            st.json(terminated_instances)
+                        else:
+                            st.warning("No instances were listed as terminating. Check IDs and permissions.")
+
+                    except ClientError as e:
+                        error_code = e.response.get("Error", {}).get("Code")
+                        error_message = e.response.get("Error", {}).get("Message")
+                        st.error(f"Error terminating instance(s): `{error_code}` - {error_message}")
+                        st.warning("Please check your AWS credentials, Instance IDs, and region.")
+                    except Exception as e:
+                        st.error(f"An unexpected error occurred: {e}")
+
+    # ---------- SECTION: INVENTORY ----------
+    elif section == "Inventory":
+        st.header("EC2 Inventory (all regions)")
+        st.write("Instances from every enabled region, fetched in one parallel pass and cached "
+                 f"for {INVENTORY_TTL_SECONDS // 60} minutes.")
+
+        force = st.button("🔄 Refresh Now", key="inventory_refresh")
+        try:
+            with st.spinner("Describing instances across regions..."):
+                inventory.ensure_fresh(force=force)
+        except ClientError as e:
+            st.error(f"Error listing regions: `{e.response.get('Error', {}).get('Code')}`")
+            st.stop()
+        except BotoCoreError as e:
+            # e.g. NoRegionError / NoCredentialsError from describe_regions
+            st.error(f"Error listing regions: {e}")
+            st.stop()
+
+        for region, error in inventory.errors.items():
+            st.warning(f"{region}: {error}")
+
+        col1, col2, col3, col4 = st.columns(4)
+        state = col1.selectbox("State", [""] + inventory.values("State"), key="inv_state")
+        itype = col2.selectbox("Instance Type", [""] + inventory.values("InstanceType"), key="inv_type")
+        vpc = col3.selectbox("VPC", [""] + inventory.values("VpcId"), key="inv_vpc")
+        region = col4.selectbox("Region", [""] + inventory.values("Region"), key="inv_region")
+        tag_text = st.text_input("Tag filter (e.g. Env=prod, Team=*)", "", key="inv_tags")
+
+        rows = inventory.query(State=state, InstanceType=itype, VpcId=vpc, Region=region,
+                               tags=parse_tag_filter(tag_text))
+
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Matching Instances", len(rows))
+        m2.metric("Regions Scanned", len(inventory.regions))
+        m3.metric("Fetch Time", f"{inventory.fetch_seconds:.1f}s")
+        m4.metric("Cache Age", f"{time.time() - inventory.fetched_at:.0f}s")
+
+        st.dataframe(
+            [dict(row, Tags=", ".join(f"{k}={v}" for k, v in row["Tags"].items())) for row in rows],
+            use_container_width=True,
+        )
+
+    # ---------- SECTION: FLEET LAUNCH ----------
+    elif section == "Fleet Launch":
+        st.header("Launch a Fleet")
+        st.write("Provision many instances in one batched request, spread across the given subnets/AZs. "
+                 "Launch progress is tracked in the background.")
+
+        mode = st.radio("Launch using", ["AMI + Instance Type", "Launch Template", "EC2 Fleet (instant)"],
+                        horizontal=True, key="fleet_mode")
+        col1, col2 = st.columns(2)
+        with col1:
+            fleet_count = st.number_input("Number of Instances", 1, 1000, 5, key="fleet_count")
+            fleet_name = st.text_input("Instance Name Tag", "MyStreamlitFleet", key="fleet_name")
+            fleet_subnets = st.text_input("Subnet IDs (comma-separated, one per AZ)", "", key="fleet_subnets")
+            allow_partial = st.checkbox("Accept partial capacity (MinCount=1)", value=True, key="fleet_partial")
+        with col2:
+            if mode == "AMI + Instance Type":
+                fleet_ami = st.text_input("AMI ID", DEFAULT_AMI_ID, key="fleet_ami")
+                fleet_type = st.selectbox("Instance Type", INSTANCE_TYPES, key="fleet_type")
+                fleet_key = st.text_input("Key Pair Name", "", key="fleet_keypair")
+                fleet_sgs = st.text_input("Security Group IDs (comma-separated)", "", key="fleet_sg_ids")
+                launch_template = None
+            else:
+                template_name = st.text_input("Launch Template Name", "", key="fleet_template")
+                template_version = st.text_input("Template Version", "$Default", key="fleet_template_version")
+                fleet_type = st.selectbox("Override Instance Type", [""] + INSTANCE_TYPES, key="fleet_type_override")
+                fleet_ami, fleet_key, fleet_sgs = None, None, ""
+                launch_template = ({"LaunchTemplateName": template_name, "Version": template_version}
+                                   if template_name else None)
+
+        if st.button("🚀 Launch Fleet", key="fleet_launch_button"):
+            if mode != "AMI + Instance Type" and not launch_template:
+                st.error("Please provide a Launch Template Name.")
+            else:
+                subnets = [x.strip() for x in fleet_subnets.split(",") if x.strip()]
+                sgs = [x.strip() for x in fleet_sgs.split(",") if x.strip()]
+                try:
+                    with st.spinner(f"Launching {fleet_count} instances..."):
+                        instance_ids, errors = launch_fleet(
+                            ec2, int(fleet_count), subnet_ids=subnets, image_id=fleet_ami,
+                            instance_type=fleet_type or None, key_name=fleet_key or None,
+                            security_group_ids=sgs, launch_template=launch_template,
+                            tags={"Name": fleet_name, "CreatedBy": "StreamlitApp"},
+                            allow_partial=allow_partial, use_ec2_fleet=mode == "EC2 Fleet (instant)",
+                        )
+                except ClientError as e:
+                    st.error(f"Error launching fleet: `{e.response.get('Error', {}).get('Code')}` - "
+                             f"{e.response.get('Error', {}).get('Message')}")
+                    instance_ids, errors = [], []
+                except BotoCoreError as e:
+                    st.error(f"Error launching fleet: {e}")
+                    instance_ids, errors = [], []
+                for error in errors:
+                    st.warning(error)
+                if instance_ids:
+                    st.success(f"Requested {len(instance_ids)} of {fleet_count} instances.")
+                    tracker.track(ec2, instance_ids, "running",
+                                  f"{fleet_name} x{len(instance_ids)} @ {time.strftime('%H:%M:%S')}",
+                                  instance_type=fleet_type or None)
+
+        jobs = [job for job in tracker.job_summaries() if job["Target"] == "running"]
+        if jobs:
+            st.subheader("Launch Jobs")
+            st.table(jobs)
+            if any(job["Waiting"] for job in jobs):
+                st.button("🔄 Refresh Status", key="fleet_refresh")
+
+    # ---------- SECTION: INSTANCE TRACKER ----------
+    elif section == "Instance Tracker":
+        st.header("Instance State Tracker")
+        st.write("Launches and terminations from this app are followed in the background until the instances "
+                 "are `running` or `terminated`, polling in batches of up to 1000 IDs with exponential backoff.")
+        auto_refresh = st.checkbox("Auto-refresh every 3s", value=False, key="tracker_auto_refresh")
+
+        jobs = tracker.job_summaries()
+        if not jobs:
+            st.info("Nothing tracked yet. Launch or terminate instances to see their progress here.")
+        else:
+            st.subheader("Jobs")
+            st.table(jobs)
+            st.subheader("Latency Distribution")
+            stats = tracker.latency_stats()
+            if stats:
+                st.dataframe(stats, use_container_width=True)
+            else:
+                st.write("No instance has reached its target state yet.")
+            st.subheader("State Transitions")
+            st.dataframe(list(reversed(tracker.transitions)), use_container_width=True)
+            for error in list(tracker.errors)[-5:]:
+                st.warning(error)
+            if auto_refresh and any(job["Waiting"] for job in jobs):
+                time.sleep(3)
+                st.rerun()
+
+    # ---------- SECTION: COST & UTILIZATION ----------
+    elif section == "Cost & Utilization":
+        st.header("Cost & Utilization Analyzer")
+        st.write("CPU, network and disk metrics for all running instances, pulled with batched "
+                 "`GetMetricData` calls and checked against the instance types offered by the launcher.")
+
+        windows = {"Last 24 hours": (24, 300), "Last 7 days": (24 * 7, 3600), "Last 14 days": (24 * 14, 3600)}
+        window = st.selectbox("Time Window", list(windows), index=1, key="util_window")
+        col1, col2 = st.columns(2)
+        low_cpu = col1.slider("Downsize below CPU p95 (%)", 5, 50, 20, key="util_low")
+        high_cpu = col2.slider("Upsize above CPU p95 (%)", 50, 100, 80, key="util_high")
+
+        if st.button("📊 Analyze", key="util_analyze"):
+            try:
+                inventory.ensure_fresh()
+                running = inventory.query(State="running")
+                if not running:
+                    st.info("No running instances found.")
+                else:
+                    hours, period = windows[window]
+                    started = time.perf_counter()
+                    with st.spinner(f"Fetching metrics for {len(running)} instances..."):
+                        stats, cached = utilization_stats(running, hours=hours, period=period)
+                    st.caption(f"{'Loaded from cache' if cached else 'Fetched from CloudWatch'} "
+                               f"in {time.perf_counter() - started:.2f}s")
+                    st.session_state.utilization = (running, stats, period)
+            except ClientError as e:
+                st.error(f"Error fetching metrics: `{e.response.get('Error', {}).get('Code')}` - "
+                         f"{e.response.get('Error', {}).get('Message')}")
+            except BotoCoreError as e:
+                st.error(f"Error fetching metrics: {e}")
+
+        if "utilization" in st.session_state:
+            running, stats, period = st.session_state.utilization
+            rows = rightsizing_report(running, stats, period=period, low_cpu=low_cpu, high_cpu=high_cpu)
+            candidates = [r for r in rows if r["Recommendation"] not in ("OK", "No data")]
+            savings = -sum(min(r["Monthly Delta ($)"] or 0, 0) for r in candidates)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Instances Analyzed", len(rows))
+            m2.metric("Right-sizing Candidates", len(candidates))
+            m3.metric("Est. Monthly Savings", f"${savings:,.2f}")
+            st.dataframe(rows, use_container_width=True)
+
+    # ---------- SECTION: AMI & TYPE CATALOG ----------
+    elif section == "AMI & Type Catalog":
+        st.header("AMI & Instance-Type Catalog")
+        st.write("A local, indexed copy of your own and popular public AMIs and of the instance types offered "
+                 f"in every enabled region, refreshed in the background every {CATALOG_MAX_AGE_SECONDS // 3600}h.")
+
+        if st.button("🔄 Sync Now", key="catalog_sync", disabled=catalog.is_syncing()):
+            catalog.sync_in_background(force=True)
+        if catalog.is_syncing():
+            st.info("Sync in progress...")
+        if catalog.sync_error:
+            st.warning(f"Last sync reported errors: {catalog.sync_error}")
+        with st.expander("Sync Status"):
+            st.table(catalog.status())
+
+        catalog_region = st.text_input("Region", region or "", key="catalog_region")
+        tab_ami, tab_types = st.tabs(["AMIs", "Instance Types"])
+        with tab_ami:
+            text = st.text_input("Search by name, ID or description", "", key="catalog_ami_text")
+            st.dataframe(catalog.search_images(catalog_region, text, limit=200), use_container_width=True)
+        with tab_types:
+            col1, col2, col3 = st.columns(3)
+            min_vcpus = col1.number_input("Min vCPUs", 0, 448, 0, key="catalog_vcpus")
+            min_mem = col2.number_input("Min Memory (GiB)", 0.0, 24576.0, 0.0, key="catalog_mem")
+            prefix = col3.text_input("Type prefix (e.g. m7g)", "", key="catalog_type_prefix")
+            st.dataframe(catalog.search_instance_types(catalog_region, min_vcpus, min_mem, prefix),
+                         use_container_width=True)
+
+    # ---------- SECTION: BULK ACTIONS ----------
+    elif section == "Bulk Actions":
+        st.header("Bulk Tag-Based Actions")
+        st.write("Select instances by tag across all regions from the cached inventory, review the plan, "
+                 "then run the action in API-sized chunks with regions processed concurrently.")
+
+        try:
+            inventory.ensure_fresh()
+        except ClientError as e:
+            st.error(f"Error loading inventory: `{e.response.get('Error', {}).get('Code')}`")
+            st.stop()
+        except BotoCoreError as e:
+            st.error(f"Error loading inventory: {e}")
+            st.stop()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            bulk_tags = st.text_input("Tag query (e.g. Env=ephemeral, Owner=*)", "", key="bulk_tags")
+            bulk_state = st.selectbox("State", [""] + inventory.values("State"), key="bulk_state")
+            bulk_region = st.selectbox("Region", [""] + inventory.values("Region"), key="bulk_region")
+        with col2:
+            action = st.selectbox("Action", list(BULK_ACTIONS), key="bulk_action")
+            new_tags = st.text_input("Tags to set (retag only, e.g. Owner=ops)", "", key="bulk_new_tags") \
+                if action == "retag" else ""
+
+        query = parse_tag_filter(bulk_tags)
+        if not query:
+            st.info("Enter a tag query to select target instances.")
+            st.stop()
+        targets = inventory.query(State=bulk_state, Region=bulk_region, tags=query)
+        plan = plan_bulk_action(targets, action)
+        planned = sum(len(ids) for _, ids in plan)
+
+        st.subheader(f"Plan: {action} {planned} instance(s)")
+        if planned < len(targets):
+            st.caption(f"{len(targets) - planned} matching instance(s) are already "
+                       f"{BULK_ACTIONS[action][1] or 'terminated'} or terminating and are skipped.")
+        st.table([{"Region": region, "Chunk Size": len(ids)} for region, ids in plan])
+        with st.expander("Target Instances"):
+            st.dataframe([{k: r[k] for k in ("InstanceId", "Name", "State", "InstanceType", "Region")}
+                          for r in targets], use_container_width=True)
+
+        tags_to_set = {k: v or "" for k, v in parse_tag_filter(new_tags).items()}
+        col1, col2 = st.columns(2)
+        if col1.button("🧪 Dry Run (check permissions)", key="bulk_dry_run", disabled=not plan):
+            with st.spinner("Validating..."):
+                st.session_state.ec2_bulk_results = run_bulk_action(plan, action, tags=tags_to_set, dry_run=True)
+
+        confirmed = action != "terminate" or st.checkbox(
+            f"I understand {planned} instance(s) will be permanently terminated.", key="bulk_confirm")
+        if col2.button(f"⚡ Run {action}", key="bulk_run", disabled=not plan or not confirmed
+                       or (action == "retag" and not tags_to_set)):
+            with st.spinner(f"Running {action} on {planned} instance(s)..."):
+                results = run_bulk_action(plan, action, tags=tags_to_set)
+            st.session_state.ec2_bulk_results = results
+            inventory.invalidate()
+            target_state = BULK_ACTIONS[action][1]
+            label = f"{action} {planned} @ {time.strftime('%H:%M:%S')}"
+            types = {r["InstanceId"]: r["InstanceType"] for r in targets}
+            # One job per region, covering every chunk that succeeded there
+            succeeded = {}
+            for row in results:
+                if target_state and row["Result"] == "ok":
+                    succeeded.setdefault(row["Region"], []).extend(row["InstanceIds"])
+            for region, ids in succeeded.items():
+                tracker.track(get_ec2_client(region), ids, target_state, f"{label} ({region})", instance_type=types)
 
-        
\ No newline at end of file
+        results = st.session_state.get("ec2_bulk_results")
+        if results:
+            st.subheader("Results")
+            st.dataframe([{k: v for k, v in r.items() if k != "InstanceIds"} for r in results],
+                         use_container_width=True)
@@ -0,0 +1,257 @@
+"""Batch scoring for models trained in the dashboards, usable without the UI.
+
+    python module/batch_scoring.py models
+    python module/batch_scoring.py score <model> <input.csv|parquet> <output.csv|parquet>
+    python module/batch_scoring.py serve --port 8765
+
+Models are the ML dashboard's registry keys, or "temperature" for the online temperature model.
+The HTTP endpoint only listens on 127.0.0.1, requires a bearer token and only reads and writes
+files under SCORES_DIR.
+"""
+import argparse
+import hmac
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import dataset_store
+import model_registry
+
+TEMPERATURE_MODEL = "temperature"
+SCORE_CHUNK_ROWS = 100_000
+# Root for endpoint inputs and outputs, and for files scored from the dashboard
+SCORES_DIR = os.environ.get("DEVOPSAI_SCORES_DIR", os.path.join(model_registry.CACHE_DIR, "scores"))
+SCORING_TOKEN = os.environ.get("DEVOPSAI_SCORING_TOKEN")
+
+
+@lru_cache(maxsize=8)
+def _load_registry_model(key):
+    import joblib
+
+    # Registry keys are hex digests; anything else could point joblib (pickle) outside MODEL_DIR
+    if not isinstance(key, str) or not re.fullmatch(r"[0-9a-f]+", key):
+        raise KeyError(f"Unknown model '{key}'.")
+    path = os.path.join(model_registry.MODEL_DIR, f"{key}.joblib")
+    if not os.path.exists(path):
+        raise KeyError(f"Unknown model '{key}'.")
+    model, meta = joblib.load(path)
+    return model.predict, tuple(meta["spec"]["features"])
+
+
+def load_model(model_id):
+    """(predict function, feature names) for a model id; registry models stay loaded in this process."""
+    if model_id == TEMPERATURE_MODEL:
+        import linear_regression
+
+        # The online model is tiny; reloading picks up observations recorded since the last call
+        model = linear_regression.OnlineLinearRegression()
+        model.refresh()
+        return model.predict, tuple(model.features)
+    return _load_registry_model(model_id)
+
+
+def list_models():
+    """Scorable models: the temperature model plus every model persisted by the registry."""
+    import linear_regression
+
+    models = [{"model": TEMPERATURE_MODEL, "features": linear_regression.FEATURES,
+               "target": linear_regression.TARGET, "type": "Online Linear Regression"}]
+    for meta in model_registry.list_models():
+        spec = meta["spec"]
+        models.append({"model": meta["key"], "features": spec["features"], "target": spec["target"],
+                       "type": spec["model_type"], "params": spec.get("params", {}), "r2": meta["r2"],
+                       "trained_at": meta["trained_at"]})
+    return models
+
+
+def output_schema(input_path, input_kind, features):
+    """Arrow schema for the scored output, fixed up front so every chunk is written with the same types.
+
+    Parquet inputs keep their own schema. CSV passthrough columns are read as strings (their
+    inferred type can change from chunk to chunk) and feature columns as float64.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if input_kind == "parquet":
+        fields = list(pq.ParquetFile(input_path).schema_arrow)
+    else:
+        fields = [pa.field(c, pa.float64() if c in features else pa.string())
+                  for c in pd.read_csv(input_path, nrows=0).columns]
+    return pa.schema([f for f in fields if f.name != "Prediction"] + [pa.field("Prediction", pa.float64())])
+
+
+def score_file(model_id, input_path, output_path, chunk_rows=SCORE_CHUNK_ROWS, on_progress=None, overwrite=False):
+    """Streams a CSV/Parquet file through a model chunk by chunk and writes rows plus a Prediction column.
+
+    The output format follows the output extension (.parquet or .csv). Memory stays bounded by
+    chunk_rows. An existing output file is only replaced with overwrite=True. Returns throughput stats.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    predict, features = load_model(model_id)
+    input_kind = "parquet" if input_path.lower().endswith((".parquet", ".pq")) else "csv"
+    to_parquet = output_path.lower().endswith((".parquet", ".pq"))
+    if not overwrite and os.path.exists(output_path):
+        raise FileExistsError(f"'{output_path}' already exists.")
+    schema = output_schema(input_path, input_kind, features)
+    missing = [c for c in features if c not in schema.names]
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {', '.join(missing)}")
+    read_dtype = {f.name: str for f in schema if f.name not in features} if input_kind == "csv" else None
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+
+    rows = 0
+    predict_seconds = 0.0
+    started = time.perf_counter()
+    writer = None
+    try:
+        with os.fdopen(fd, "wb") as out:
+            try:
+                for chunk in dataset_store.iter_chunks(input_path, input_kind, chunk_rows, dtype=read_dtype):
+                    predict_started = time.perf_counter()
+                    chunk["Prediction"] = predict(chunk[list(features)])
+                    predict_seconds += time.perf_counter() - predict_started
+                    if to_parquet:
+                        if writer is None:
+                            writer = pq.ParquetWriter(out, schema)
+                        writer.write_table(pa.Table.from_pandas(chunk[schema.names], schema=schema,
+                                                                preserve_index=False))
+                    else:
+                        chunk.to_csv(out, header=rows == 0, index=False)
+                    rows += len(chunk)
+                    if on_progress:
+                        on_progress(rows, time.perf_counter() - started)
+            finally:
+                if writer is not None:
+                    writer.close()
+        if overwrite:
+            os.replace(tmp_path, output_path)
+        else:
+            # A hard link never replaces a file that appeared while scoring
+            os.link(tmp_path, output_path)
+            os.remove(tmp_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    seconds = time.perf_counter() - started
+    return {
+        "model": model_id,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+        "predict_rows_per_sec": round(rows / predict_seconds) if predict_seconds else None,
+        "output": os.path.abspath(output_path),
+        "output_bytes": os.path.getsize(output_path),
+    }
+
+
+def resolve_under(root, path):
+    """Real path of `path` (relative paths are taken from root), refusing anything that resolves outside root."""
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"'{path}' is outside {root}.")
+    return resolved
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """GET /models lists models; POST /score with {"model", "input", "output"} scores a file.
+
+    Every request needs `Authorization: Bearer <token>`; POST bodies must be application/json,
+    which browsers cannot send cross-origin without a preflight this server never approves.
+    """
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        if hmac.compare_digest(self.headers.get("Authorization", "").encode(), f"Bearer {self.server.token}".encode()):
+            return True
+        self._reply(401, {"error": "Missing or invalid token"})
+        return False
+
+    def do_GET(self):
+        if self.path != "/models":
+            self._reply(404, {"error": "Not found"})
+        elif self._authorized():
+            self._reply(200, list_models())
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._reply(404, {"error": "Not found"})
+            return
+        if not self._authorized():
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._reply(415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            stats = score_file(request["model"], resolve_under(self.server.root, request["input"]),
+                               resolve_under(self.server.root, request["output"]),
+                               chunk_rows=int(request.get("chunk_rows", SCORE_CHUNK_ROWS)))
+        except FileExistsError as e:
+            self._reply(409, {"error": str(e)})
+        except (KeyError, ValueError, TypeError, OSError) as e:
+            # TypeError: the body is valid JSON but not an object
+            self._reply(400, {"error": e.args[0] if isinstance(e, KeyError) else str(e)})
+        else:
+            self._reply(200, stats)
+
+
+def serve(port=8765, token=None, root=SCORES_DIR, background=False):
+    """Runs the scoring endpoint on 127.0.0.1; with background=True it runs in a daemon thread.
+
+    The token defaults to DEVOPSAI_SCORING_TOKEN, or a random one; it is available as server.token.
+    """
+    os.makedirs(root, exist_ok=True)
+    server = ThreadingHTTPServer(("127.0.0.1", port), ScoringHandler)
+    server.token = token or SCORING_TOKEN or secrets.token_urlsafe(24)
+    server.root = root
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Batch scoring endpoint on http://127.0.0.1:{server.server_port} serving files under {root}")
+    print(f"Authorization: Bearer {server.token}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("models", help="List scorable models")
+    score = commands.add_parser("score", help="Score a CSV/Parquet file")
+    score.add_argument("model")
+    score.add_argument("input")
+    score.add_argument("output")
+    score.add_argument("--chunk-rows", type=int, default=SCORE_CHUNK_ROWS)
+    score.add_argument("--overwrite", action="store_true", help="Replace an existing output file")
+    http = commands.add_parser("serve", help="Run the local HTTP scoring endpoint")
+    http.add_argument("--port", type=int, default=8765)
+    http.add_argument("--root", default=SCORES_DIR, help="Directory the endpoint may read and write")
+    args = parser.parse_args()
+
+    if args.command == "models":
+        print(json.dumps(list_models(), indent=2))
+    elif args.command == "score":
+        print(json.dumps(score_file(args.model, args.input, args.output, args.chunk_rows,
+                                    overwrite=args.overwrite), indent=2))
+    else:
+        serve(args.port, root=args.root)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import time
+
+# Ingested datasets are cached as Arrow IPC files; override the location with DEVOPSAI_CACHE_DIR
+CACHE_DIR = os.environ.get("DEVOPSAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "devopsai"))
+DATASET_DIR = os.path.join(CACHE_DIR, "datasets")
+CHUNK_ROWS = 250_000
+MAX_CATEGORIES = 1000
+
+
+def file_fingerprint(path):
+    """Cheap key for a file on disk: path, size and modification time."""
+    stat = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+def stream_fingerprint(stream, block_size=8 * 1024 * 1024):
+    """Content hash of a file-like object (e.g. an upload), read block by block."""
+    digest = hashlib.sha1()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def iter_chunks(source, kind, chunk_rows=CHUNK_ROWS, dtype=None):
+    """Yields pandas DataFrames of at most chunk_rows rows from a CSV or Parquet path/stream."""
+    import pandas as pd
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=dtype, low_memory=False)
+
+
+def profile_columns(chunks):
+    """First pass: per-column value ranges, null flags and small category sets, in bounded memory."""
+    import numpy as np
+
+    stats = {}
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        for name in chunk.columns:
+            col = chunk[name]
+            s = stats.setdefault(name, {"kind": None, "min": None, "max": None, "nulls": False,
+                                        "integral": True, "categories": set()})
+            s["nulls"] = s["nulls"] or bool(col.isna().any())
+            kind = "bool" if col.dtype.kind == "b" else "numeric" if col.dtype.kind in "iuf" else "text"
+            if s["kind"] not in (None, kind):
+                # A column that is numeric in one chunk and text in another is kept as plain strings;
+                # categories profiled from parsed numbers would not match the raw text read back later
+                s["kind"], s["categories"] = "text", None
+            elif s["kind"] is None:
+                s["kind"] = kind
+            if kind == "numeric":
+                values = col.dropna().to_numpy()
+                if len(values):
+                    s["min"] = values.min() if s["min"] is None else min(s["min"], values.min())
+                    s["max"] = values.max() if s["max"] is None else max(s["max"], values.max())
+                    if col.dtype.kind == "f":
+                        s["integral"] = s["integral"] and bool(np.all(np.mod(values, 1) == 0))
+            elif kind == "text" and s["categories"] is not None:
+                s["categories"].update(col.dropna().astype(str).unique())
+                if len(s["categories"]) > MAX_CATEGORIES:
+                    s["categories"] = None
+    return stats, rows
+
+
+def choose_dtypes(stats, rows):
+    """Smallest pandas dtype per column: narrow ints, float32, bool, or category for low-cardinality text."""
+    import numpy as np
+
+    dtypes = {}
+    for name, s in stats.items():
+        if s["kind"] == "bool" and not s["nulls"]:
+            dtypes[name] = "bool"
+        elif s["kind"] == "numeric" and s["min"] is None:
+            dtypes[name] = "float32"
+        elif s["kind"] == "numeric" and s["integral"] and not s["nulls"]:
+            candidates = ("uint8", "uint16", "uint32", "uint64") if s["min"] >= 0 else ("int8", "int16", "int32", "int64")
+            dtypes[name] = next(t for t in candidates
+                                if np.iinfo(t).min <= s["min"] and s["max"] <= np.iinfo(t).max)
+        elif s["kind"] == "numeric":
+            # float32 keeps integers exactly only up to 2**24
+            large = max(abs(s["min"]), abs(s["max"])) >= 2 ** 24
+            dtypes[name] = "float64" if large and s["integral"] else "float32"
+        elif s["categories"] is not None and len(s["categories"]) <= max(rows // 2, 1):
+            dtypes[name] = sorted(s["categories"])
+        else:
+            dtypes[name] = "string"
+    return dtypes
+
+
+def arrow_schema(dtypes):
+    """Arrow schema matching choose_dtypes, fixed before writing so every chunk gets the same types.
+
+    Inferring it from the first chunk fails when a column is entirely empty there (type null).
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    fields = []
+    for name, target in dtypes.items():
+        if isinstance(target, list):
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        elif target == "string":
+            fields.append(pa.field(name, pa.string()))
+        else:
+            fields.append(pa.field(name, pa.from_numpy_dtype(np.dtype(target))))
+    return pa.schema(fields)
+
+
+def apply_dtypes(chunk, dtypes):
+    import pandas as pd
+
+    out = {}
+    for name, target in dtypes.items():
+        col = chunk[name]
+        if isinstance(target, list):
+            out[name] = pd.Categorical(col.where(col.isna(), col.astype(str)), categories=target)
+        elif target == "string":
+            out[name] = col.where(col.isna(), col.astype(str)).astype(object)
+        else:
+            out[name] = col.astype(target)
+    return pd.DataFrame(out)
+
+
+def manifest_path(key):
+    return os.path.join(DATASET_DIR, f"{key}.json")
+
+
+def arrow_path(key):
+    return os.path.join(DATASET_DIR, f"{key}.arrow")
+
+
+def ingest(source, name, kind=None, key=None, chunk_rows=CHUNK_ROWS):
+    """Converts a CSV/Parquet path or stream into a typed, memory-mappable Arrow file.
+
+    Two chunked passes keep memory bounded: the first profiles the columns, the second casts each
+    chunk to the chosen dtypes and appends it to the Arrow file. Already-ingested sources (same
+    key) return immediately. Returns the dataset manifest.
+    """
+    import pyarrow as pa
+
+    kind = kind or ("parquet" if name.lower().endswith((".parquet", ".pq")) else "csv")
+    if key is None:
+        key = stream_fingerprint(source) if hasattr(source, "read") else file_fingerprint(source)
+    if os.path.exists(manifest_path(key)) and os.path.exists(arrow_path(key)):
+        return load_manifest(key)
+
+    started = time.perf_counter()
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    stats, rows = profile_columns(iter_chunks(source, kind, chunk_rows))
+    dtypes = choose_dtypes(stats, rows)
+    # Text columns are re-read as strings so every chunk agrees on their type
+    read_dtype = {c: str for c, s in stats.items() if s["kind"] == "text"} if kind == "csv" else None
+
+    schema = arrow_schema(dtypes)
+    tmp_path = f"{arrow_path(key)}.tmp"
+    writer = None
+    try:
+        for chunk in iter_chunks(source, kind, chunk_rows, dtype=read_dtype):
+            table = pa.Table.from_pandas(apply_dtypes(chunk, dtypes), schema=schema, preserve_index=False)
+            if writer is None:
+                # The first table's schema also carries the pandas metadata used by load_frame
+                writer = pa.ipc.new_file(tmp_path, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            raise ValueError("The file contains no rows.")
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, arrow_path(key))
+
+    manifest = {
+        "key": key,
+        "name": name,
+        "rows": rows,
+        "columns": {c: ("category" if isinstance(t, list) else t) for c, t in dtypes.items()},
+        "arrow_bytes": os.path.getsize(arrow_path(key)),
+        "ingest_seconds": round(time.perf_counter() - started, 2),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(manifest_path(key), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def load_manifest(key):
+    with open(manifest_path(key), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_datasets():
+    """Manifests of every ingested dataset, newest first."""
+    if not os.path.isdir(DATASET_DIR):
+        return []
+    manifests = []
+    for entry in os.listdir(DATASET_DIR):
+        if entry.endswith(".json") and os.path.exists(arrow_path(entry[:-5])):
+            manifests.append(load_manifest(entry[:-5]))
+    return sorted(manifests, key=lambda m: m["created"], reverse=True)
+
+
+def load_table(key):
+    """Zero-copy, memory-mapped Arrow table; pages are read from disk only when touched."""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(arrow_path(key), "r")).read_all()
+
+
+def load_frame(key, columns=None, max_rows=None, seed=0):
+    """Pandas view of an ingested dataset, optionally projected and row-sampled to bound memory."""
+    import numpy as np
+
+    table = load_table(key)
+    if columns is not None:
+        table = table.select(list(columns))
+    if max_rows and table.num_rows > max_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(table.num_rows, max_rows, replace=False))
+        table = table.take(rows)
+    return table.to_pandas()
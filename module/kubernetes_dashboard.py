@@ -1,13 +1,560 @@
-def run():  
-    import streamlit as st
+import heapq
+import os
+import re
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+# ---------- SHARED API CLIENT ----------
+
+# One ApiClient (and therefore one urllib3 connection pool) is shared by every dashboard session.
+# Override through the environment, e.g. K8S_QPS=5 K8S_BURST=10 for a small Minikube.
+K8S_POOL_SIZE = int(os.environ.get("K8S_POOL_SIZE", "32"))
+K8S_QPS = float(os.environ.get("K8S_QPS", "50"))
+K8S_BURST = int(os.environ.get("K8S_BURST", "100"))
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter that also counts queued and in-flight requests."""
+    def __init__(self, qps, burst):
+        self.qps = float(qps)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.total = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self):
+        """Blocks until a token is available; a qps of 0 or less disables throttling."""
+        with self.lock:
+            wait = 0.0
+            if self.qps > 0:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.qps)
+                self.updated = now
+                # Reserve a token up front; a negative balance is the queue ahead of this caller
+                self.tokens -= 1
+                wait = max(0.0, -self.tokens / self.qps)
+            self.queued += 1
+        if wait:
+            time.sleep(wait)
+        with self.lock:
+            self.queued -= 1
+            self.in_flight += 1
+            self.total += 1
+            self.wait_seconds += wait
+            if wait:
+                self.throttled += 1
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "Queued": self.queued,
+                "In Flight": self.in_flight,
+                "Total Requests": self.total,
+                "Throttled": self.throttled,
+                "Avg Wait (ms)": round(self.wait_seconds / self.total * 1000, 2) if self.total else 0.0,
+            }
+
+
+def create_api_client(pool_size=K8S_POOL_SIZE, qps=K8S_QPS, burst=K8S_BURST):
+    """Builds a keep-alive ApiClient with a sized connection pool whose requests pass through a TokenBucket."""
     from kubernetes import client, config
+    from urllib3.connection import HTTPConnection
+
+    configuration = client.Configuration()
+    config.load_kube_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = pool_size
+    # TCP keep-alive so idle pooled connections survive NAT/load-balancer timeouts
+    configuration.socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    api_client = client.ApiClient(configuration)
+
+    limiter = TokenBucket(qps, burst)
+    request = api_client.rest_client.request
+
+    def throttled_request(*args, **kwargs):
+        limiter.acquire()
+        try:
+            return request(*args, **kwargs)
+        finally:
+            limiter.release()
+
+    api_client.rest_client.request = throttled_request
+    api_client.limiter = limiter
+    return api_client
+
+
+# ---------- MANIFEST APPLY ENGINE ----------
+
+# Objects are applied tier by tier so that anything a later object depends on
+# (its namespace, its CRD, the config it mounts) already exists on the server.
+# Objects inside one tier are independent and are applied concurrently.
+APPLY_ORDER = [
+    ["Namespace"],
+    ["CustomResourceDefinition"],
+    ["ServiceAccount", "ClusterRole", "Role", "ClusterRoleBinding", "RoleBinding",
+     "PriorityClass", "StorageClass", "PersistentVolume", "ResourceQuota", "LimitRange"],
+    ["ConfigMap", "Secret", "PersistentVolumeClaim"],
+    ["Service"],
+    ["Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Job", "CronJob", "Pod"],
+]
+
+
+def load_manifests(text=None, directory=None):
+    """Parses a multi-document YAML bundle and/or every *.yaml/*.yml/*.json file under a directory.
+
+    Returns (objects, errors); a document that is not a mapping is skipped with one error naming it.
+    """
+    import yaml
+
+    sources = []
+    if text:
+        sources.append(("bundle", text))
+    if directory:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.endswith((".yaml", ".yml", ".json")):
+                    path = os.path.join(root, name)
+                    with open(path, "r", encoding="utf-8") as f:
+                        sources.append((path, f.read()))
+
+    objects, errors = [], []
+    for label, source in sources:
+        for i, doc in enumerate(yaml.safe_load_all(source), 1):
+            if not doc:
+                continue
+            if not isinstance(doc, dict):
+                errors.append(f"{label}, document {i}: expected a mapping, got {type(doc).__name__}")
+                continue
+            # Expand "kind: List" wrappers the same way kubectl does
+            if str(doc.get("kind") or "").endswith("List") and "items" in doc:
+                for j, item in enumerate(doc["items"] or [], 1):
+                    if isinstance(item, dict):
+                        objects.append(item)
+                    elif item:
+                        errors.append(f"{label}, document {i}, item {j}: expected a mapping, "
+                                      f"got {type(item).__name__}")
+            else:
+                objects.append(doc)
+    return objects, errors
+
+
+def order_manifests(objects):
+    """Groups objects into dependency tiers; unknown kinds (custom resources, ingresses, ...) go last."""
+    tier_of = {kind: i for i, kinds in enumerate(APPLY_ORDER) for kind in kinds}
+    tiers = [[] for _ in range(len(APPLY_ORDER) + 1)]
+    for obj in objects:
+        tiers[tier_of.get(obj.get("kind"), len(APPLY_ORDER))].append(obj)
+    return [tier for tier in tiers if tier]
+
+
+def _comparable(obj):
+    """The object without the metadata that every apply or read changes (resourceVersion, managedFields)."""
+    meta = {k: v for k, v in obj.get("metadata", {}).items() if k not in ("resourceVersion", "managedFields")}
+    return dict(obj, metadata=meta)
+
+
+def owns_fields(live, field_manager):
+    """True when field_manager already has an Apply entry in the live object's managedFields."""
+    return any(entry.get("manager") == field_manager and entry.get("operation") == "Apply"
+               for entry in live.get("metadata", {}).get("managedFields") or [])
+
+
+def apply_manifests(api_client, objects, namespace="default", max_workers=16,
+                    field_manager="devopsai-dashboard", force_conflicts=False, dry_run=False):
+    """Server-side applies objects in dependency order.
+
+    Every object is applied, so fields dropped from a manifest are pruned and fields owned by
+    another manager are taken over; an object is reported "unchanged" when the applied result
+    equals its live state. Returns one result row per object with the outcome and the
+    per-object latency.
+    """
+    from kubernetes import dynamic
     from kubernetes.client.rest import ApiException
+    from kubernetes.dynamic.exceptions import NotFoundError, ResourceNotFoundError
+
+    dyn = dynamic.DynamicClient(api_client)
+
+    def apply_one(obj):
+        meta = obj.get("metadata", {})
+        row = {"Kind": obj.get("kind"), "Name": meta.get("name"), "Namespace": "",
+               "Result": "", "Latency (ms)": 0.0, "Error": ""}
+        start = time.perf_counter()
+        try:
+            resource = dyn.resources.get(api_version=obj["apiVersion"], kind=obj["kind"])
+            ns = (meta.get("namespace") or namespace) if resource.namespaced else None
+            row["Namespace"] = ns or ""
+            try:
+                live = resource.get(name=meta["name"], namespace=ns).to_dict()
+            except NotFoundError:
+                live = None
+            kwargs = {"field_manager": field_manager, "force_conflicts": force_conflicts}
+            if dry_run:
+                kwargs["dry_run"] = "All"
+            applied = resource.server_side_apply(body=obj, name=meta["name"], namespace=ns, **kwargs).to_dict()
+            if live is None:
+                row["Result"] = "created"
+            elif _comparable(applied) == _comparable(live) and owns_fields(live, field_manager):
+                row["Result"] = "unchanged"
+            else:
+                row["Result"] = "configured"
+            if dry_run and row["Result"] != "unchanged":
+                row["Result"] += " (dry run)"
+        except (ApiException, ResourceNotFoundError, KeyError) as e:
+            row["Result"] = "failed"
+            row["Error"] = getattr(e, "reason", None) or str(e)
+        row["Latency (ms)"] = round((time.perf_counter() - start) * 1000, 1)
+        return row
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for tier in order_manifests(objects):
+            results.extend(pool.map(apply_one, tier))
+            if any(obj.get("kind") == "CustomResourceDefinition" for obj in tier):
+                # Newly registered CRDs are only visible after re-discovery
+                dyn.resources.invalidate_cache()
+    return results
+
+
+# ---------- POD LOG STREAMING ----------
+
+class PodLogTail:
+    """Follows the logs of several pods in background threads, keeping a bounded buffer per pod."""
+    def __init__(self, core_api, namespace, pod_names, container=None,
+                 tail_lines=200, max_lines=2000, max_line_length=4096):
+        self.core_api = core_api
+        self.namespace = namespace
+        self.pod_names = list(pod_names)
+        self.container = container
+        self.tail_lines = tail_lines
+        self.max_line_length = max_line_length
+        # A deque with maxlen drops the oldest lines, so a noisy pod cannot grow memory without bound
+        self.buffers = {pod: deque(maxlen=max_lines) for pod in self.pod_names}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.responses = {}
+        self.threads = [
+            threading.Thread(target=self._follow, args=(pod,), daemon=True, name=f"log-tail-{pod}")
+            for pod in self.pod_names
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _follow(self, pod):
+        """Streams one pod's log line by line until stopped or the stream ends."""
+        kwargs = {"follow": True, "timestamps": True, "tail_lines": self.tail_lines,
+                  "_preload_content": False}
+        if self.container:
+            kwargs["container"] = self.container
+        try:
+            resp = self.core_api.read_namespaced_pod_log(pod, self.namespace, **kwargs)
+            self.responses[pod] = resp
+            pending = b""
+            for chunk in resp.stream(4096, decode_content=True):
+                if self.stop_event.is_set():
+                    break
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                if len(pending) > self.max_line_length:
+                    lines.append(pending)
+                    pending = b""
+                if lines:
+                    self._append(pod, lines)
+            if pending:
+                self._append(pod, [pending])
+        except Exception as e:
+            if not self.stop_event.is_set():
+                self.errors[pod] = str(e)
+        finally:
+            self.responses.pop(pod, None)
+
+    def _append(self, pod, raw_lines):
+        entries = []
+        for raw in raw_lines:
+            line = raw[:self.max_line_length].decode("utf-8", errors="replace").rstrip("\r")
+            # With timestamps=True every line starts with an RFC3339 timestamp
+            ts, _, message = line.partition(" ")
+            entries.append((ts, pod, message))
+        with self.lock:
+            self.buffers[pod].extend(entries)
+
+    def snapshot(self, pattern=None, limit=500):
+        """Returns the latest lines of all pods merged by timestamp, optionally filtered by a regex."""
+        with self.lock:
+            per_pod = [list(buf) for buf in self.buffers.values()]
+        merged = heapq.merge(*per_pod, key=lambda entry: entry[0])
+        if pattern:
+            regex = re.compile(pattern)
+            merged = (entry for entry in merged if regex.search(entry[2]))
+        return list(deque(merged, maxlen=limit))
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def stop(self):
+        self.stop_event.set()
+        for resp in list(self.responses.values()):
+            try:
+                resp.close()
+            except Exception:
+                pass
+
+
+def pods_for_deployment(core_api, apps_api, name, namespace="default"):
+    """Resolves a deployment's label selector to the names of its pods."""
+    dep = apps_api.read_namespaced_deployment(name, namespace)
+    labels = dep.spec.selector.match_labels or {}
+    selector = ",".join(f"{k}={v}" for k, v in labels.items())
+    return [p.metadata.name for p in core_api.list_namespaced_pod(namespace, label_selector=selector).items]
 
-    # Load kubeconfig (works for Minikube too)
+
+# ---------- ROLLOUT MONITOR ----------
+
+class RolloutMonitor:
+    """Watches a deployment with its ReplicaSets, pods and events and derives rollout status from the stream.
+
+    Each resource kind is watched over one long-lived connection that is kept open across reruns,
+    so rendering the page never re-lists anything from the API server.
+    """
+    def __init__(self, core_api, apps_api, name, namespace="default", max_timeline=500):
+        self.name = name
+        self.namespace = namespace
+        self.deployment = apps_api.read_namespaced_deployment(name, namespace)
+        labels = self.deployment.spec.selector.match_labels or {}
+        self.selector = ",".join(f"{k}={v}" for k, v in labels.items())
+        self.replicasets = {}
+        self.pods = {}
+        self.timeline = deque(maxlen=max_timeline)
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watches = []
+        self.last_progress_at = time.time()
+        self._progress_key = None
+        self._pod_state = {}
+        # Last resourceVersion handled per object uid, so a relist does not replay what was already recorded
+        self._versions = {}
+        self._record("Monitor", f"Started watching deployment '{name}'")
+
+        streams = [
+            ("deployment", apps_api.list_namespaced_deployment, {"field_selector": f"metadata.name={name}"}),
+            ("replicaset", apps_api.list_namespaced_replica_set, {"label_selector": self.selector}),
+            ("pod", core_api.list_namespaced_pod, {"label_selector": self.selector}),
+            ("event", core_api.list_namespaced_event, {}),
+        ]
+        self.threads = [
+            threading.Thread(target=self._watch_loop, args=stream, daemon=True, name=f"rollout-{stream[0]}")
+            for stream in streams
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _watch_loop(self, kind, list_func, kwargs):
+        from kubernetes import watch
+        from kubernetes.client.rest import ApiException
+
+        handler = getattr(self, f"_on_{kind}")
+        resource_version = None
+        relist = False
+        while not self.stop_event.is_set():
+            w = watch.Watch()
+            self.watches.append(w)
+            try:
+                if relist:
+                    resource_version = self._relist(kind, list_func, kwargs)
+                    relist = False
+                stream_kwargs = dict(kwargs, timeout_seconds=300)
+                if resource_version:
+                    stream_kwargs["resource_version"] = resource_version
+                for event in w.stream(list_func, self.namespace, **stream_kwargs):
+                    if self.stop_event.is_set():
+                        break
+                    resource_version = event["object"].metadata.resource_version
+                    with self.lock:
+                        self._handle(handler, event["type"], event["object"])
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resourceVersion was compacted away; relist and resume watching from the listing
+                    resource_version, relist = None, True
+                else:
+                    self.errors[kind] = str(e)
+                    self.stop_event.wait(5)
+            except Exception as e:
+                self.errors[kind] = str(e)
+                self.stop_event.wait(5)
+            finally:
+                self.watches.remove(w)
+
+    def _relist(self, kind, list_func, kwargs):
+        """Replaces the kept state of one resource kind with a fresh listing; returns its resourceVersion.
+
+        Objects deleted while the watch was down never get a DELETED event, so anything missing
+        from the listing is dropped instead of being merged with the listed objects.
+        """
+        listing = list_func(self.namespace, **kwargs)
+        handler = getattr(self, f"_on_{kind}")
+        with self.lock:
+            kept = {"replicaset": self.replicasets, "pod": self.pods}.get(kind, {})
+            listed = {item.metadata.name for item in listing.items}
+            for name in set(kept) - listed:
+                self._handle(handler, "DELETED", kept[name])
+            for item in listing.items:
+                self._handle(handler, "ADDED", item)
+        return listing.metadata.resource_version
+
+    def _handle(self, handler, event_type, obj):
+        """Passes an object to its handler unless this exact (uid, resourceVersion) was already handled."""
+        uid, version = obj.metadata.uid, obj.metadata.resource_version
+        if event_type == "DELETED":
+            self._versions.pop(uid, None)
+        elif self._versions.get(uid) == version:
+            return
+        else:
+            self._versions[uid] = version
+        handler(event_type, obj)
+
+    def _record(self, source, message, when=None):
+        self.timeline.append({"Time": when or datetime.now(timezone.utc), "Source": source, "Message": message})
+
+    def _on_deployment(self, event_type, dep):
+        self.deployment = dep
+        dep_status = dep.status
+        key = (dep.metadata.generation, dep_status.updated_replicas,
+               dep_status.ready_replicas, dep_status.available_replicas)
+        if key != self._progress_key:
+            self._progress_key = key
+            self.last_progress_at = time.time()
+            self._record("Deployment", f"gen {dep.metadata.generation}: "
+                                       f"{dep_status.updated_replicas or 0} updated, "
+                                       f"{dep_status.ready_replicas or 0} ready, "
+                                       f"{dep_status.available_replicas or 0} available of {dep.spec.replicas}")
+
+    def _on_replicaset(self, event_type, rs):
+        name = rs.metadata.name
+        previous = self.replicasets.get(name)
+        if event_type == "DELETED":
+            self.replicasets.pop(name, None)
+            self._record("ReplicaSet", f"{name} deleted")
+            return
+        self.replicasets[name] = rs
+        if previous is None or previous.spec.replicas != rs.spec.replicas:
+            revision = (rs.metadata.annotations or {}).get("deployment.kubernetes.io/revision", "?")
+            self._record("ReplicaSet", f"{name} scaled to {rs.spec.replicas} (revision {revision})")
+
+    def _on_pod(self, event_type, pod):
+        name = pod.metadata.name
+        if event_type == "DELETED":
+            self.pods.pop(name, None)
+            self._pod_state.pop(name, None)
+            self._record("Pod", f"{name} deleted")
+            return
+        self.pods[name] = pod
+        state = (pod.status.phase, self._ready_time(pod) is not None)
+        if self._pod_state.get(name) != state:
+            self._pod_state[name] = state
+            self._record("Pod", f"{name} {state[0]}{', ready' if state[1] else ''}")
+
+    def _on_event(self, event_type, ev):
+        involved = ev.involved_object.name
+        if involved == self.name or involved in self.replicasets or involved in self.pods:
+            when = ev.last_timestamp or ev.event_time or ev.metadata.creation_timestamp
+            self._record(f"Event/{ev.involved_object.kind}", f"{ev.reason}: {ev.message}", when)
+
+    @staticmethod
+    def _ready_time(pod):
+        for cond in pod.status.conditions or []:
+            if cond.type == "Ready" and cond.status == "True":
+                return cond.last_transition_time
+        return None
+
+    def status(self):
+        """Summarises rollout progress, surge/unavailable counts, per-pod time-to-ready and stuck detection."""
+        with self.lock:
+            dep = self.deployment
+            pods = list(self.pods.values())
+            idle_for = time.time() - self.last_progress_at
+        desired = dep.spec.replicas or 0
+        dep_status = dep.status
+        updated = dep_status.updated_replicas or 0
+        available = dep_status.available_replicas or 0
+        total = dep_status.replicas or 0
+        complete = (updated == desired and available == desired and total == desired
+                    and (dep_status.observed_generation or 0) >= (dep.metadata.generation or 0))
+
+        stuck_reason = None
+        for cond in dep_status.conditions or []:
+            if cond.type == "Progressing" and cond.reason == "ProgressDeadlineExceeded":
+                stuck_reason = cond.message
+        deadline = dep.spec.progress_deadline_seconds or 600
+        if not complete and not stuck_reason and idle_for > deadline:
+            stuck_reason = f"No progress observed for {idle_for:.0f}s (deadline {deadline}s)"
+
+        pod_rows = []
+        for pod in sorted(pods, key=lambda p: p.metadata.creation_timestamp):
+            ready_at = self._ready_time(pod)
+            created = pod.metadata.creation_timestamp
+            pod_rows.append({
+                "Pod": pod.metadata.name,
+                "Phase": pod.status.phase,
+                "Hash": (pod.metadata.labels or {}).get("pod-template-hash", ""),
+                "Time to Ready (s)": round((ready_at - created).total_seconds(), 1) if ready_at else None,
+            })
+
+        strategy = dep.spec.strategy.rolling_update if dep.spec.strategy else None
+        return {
+            "desired": desired,
+            "updated": updated,
+            "ready": dep_status.ready_replicas or 0,
+            "available": available,
+            "surge": max(0, total - desired),
+            "unavailable": dep_status.unavailable_replicas or max(0, desired - available),
+            "max_surge": strategy.max_surge if strategy else None,
+            "max_unavailable": strategy.max_unavailable if strategy else None,
+            "progress": (updated + available) / (2 * desired) if desired else 1.0,
+            "complete": complete,
+            "stuck_reason": stuck_reason,
+            "pods": pod_rows,
+        }
+
+    def events(self):
+        with self.lock:
+            return sorted(self.timeline, key=lambda e: e["Time"])
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def stop(self):
+        self.stop_event.set()
+        for w in list(self.watches):
+            w.stop()
+
+
+def run():
+    import streamlit as st
+    from kubernetes import client
+    from kubernetes.client.rest import ApiException
+
+    # Load kubeconfig (works for Minikube too); the client is created once and shared by all sessions
     try:
-        config.load_kube_config()
-        v1 = client.CoreV1Api()
-        apps_v1 = client.AppsV1Api()
+        api_client = st.cache_resource(create_api_client)()
+        v1 = client.CoreV1Api(api_client)
+        apps_v1 = client.AppsV1Api(api_client)
     except Exception as e:
         st.error(f"Error loading kubeconfig: {e}")
         st.stop()
@@ -18,11 +565,18 @@ def run():
         "List Pods",
         "Create Pod",
         "Delete Pod",
+        "Apply Manifests",
+        "Pod Logs",
         "List Nodes",
         "List Deployments",
+        "Rollout Monitor",
         "List Services"
     ])
 
+    with st.sidebar.expander("📈 API Client Metrics"):
+        st.caption(f"Pool size {K8S_POOL_SIZE}, {K8S_QPS:g} QPS, burst {K8S_BURST} (shared by all sessions)")
+        st.table([api_client.limiter.metrics()])
+
     # ---------- MENU: LIST PODS ----------
     if menu == "List Pods":
         st.subheader("📜 Pods in 'default' namespace")
@@ -77,6 +631,99 @@ def run():
             except ApiException as e:
                 st.error(f"Error deleting pod: {e}")
 
+    # ---------- MENU: APPLY MANIFESTS ----------
+    elif menu == "Apply Manifests":
+        st.subheader("📑 Apply a Manifest Bundle")
+        st.write("Objects are applied with server-side apply in dependency order "
+                 "(namespaces, CRDs, config, workloads); objects already matching the cluster are "
+                 "reported as unchanged.")
+        bundle_text = st.text_area("Multi-document YAML", height=250, placeholder="apiVersion: v1\nkind: Namespace\n...")
+        uploaded = st.file_uploader("...or upload manifest files", type=["yaml", "yml", "json"], accept_multiple_files=True)
+        manifest_dir = st.text_input("...or a directory of manifests on the server", "")
+        col1, col2 = st.columns(2)
+        with col1:
+            target_ns = st.text_input("Default namespace", "default")
+            workers = st.slider("Parallel workers", 1, 64, 16)
+        with col2:
+            dry_run = st.checkbox("Server-side dry run", value=False)
+            force = st.checkbox("Force field-ownership conflicts", value=False)
+
+        if st.button("Apply"):
+            texts = [bundle_text] + [f.getvalue().decode("utf-8") for f in uploaded or []]
+            try:
+                objects, errors = load_manifests("\n---\n".join(t for t in texts if t.strip()),
+                                                 manifest_dir.strip() or None)
+            except Exception as e:
+                st.error(f"Error parsing manifests: {e}")
+                st.stop()
+            for error in errors:
+                st.warning(f"Skipped {error}")
+            if not objects:
+                st.warning("No objects found to apply.")
+            else:
+                started = time.perf_counter()
+                with st.spinner(f"Applying {len(objects)} objects..."):
+                    results = apply_manifests(v1.api_client, objects, namespace=target_ns,
+                                              max_workers=workers, force_conflicts=force, dry_run=dry_run)
+                elapsed = time.perf_counter() - started
+                counts = {}
+                for row in results:
+                    counts[row["Result"]] = counts.get(row["Result"], 0) + 1
+                st.success(f"✅ Processed {len(results)} objects in {elapsed:.2f}s: "
+                           + ", ".join(f"{n} {r}" for r, n in sorted(counts.items())))
+                st.dataframe(results)
+
+    # ---------- MENU: POD LOGS ----------
+    elif menu == "Pod Logs":
+        st.subheader("📜 Pod Logs")
+        source = st.radio("Source", ["Single Pod", "Deployment"], horizontal=True)
+        try:
+            if source == "Single Pod":
+                pod_list = [p.metadata.name for p in v1.list_namespaced_pod(namespace="default").items]
+                targets = [st.selectbox("Select Pod", pod_list)] if pod_list else []
+            else:
+                dep_list = [d.metadata.name for d in apps_v1.list_namespaced_deployment(namespace="default").items]
+                dep_name = st.selectbox("Select Deployment", dep_list)
+                targets = pods_for_deployment(v1, apps_v1, dep_name) if dep_name else []
+        except ApiException as e:
+            st.error(f"Error listing pods: {e}")
+            targets = []
+
+        col1, col2 = st.columns(2)
+        with col1:
+            tail_lines = st.number_input("Initial lines per pod", 0, 5000, 200, 50)
+            max_lines = st.number_input("Buffer size per pod (lines)", 100, 50000, 2000, 100)
+        with col2:
+            pattern = st.text_input("Regex filter", "")
+            auto_refresh = st.checkbox("Auto-refresh every 2s", value=False)
+
+        tail = st.session_state.get("k8s_log_tail")
+        if st.button("▶️ Start Streaming", disabled=not targets):
+            if tail:
+                tail.stop()
+            tail = PodLogTail(v1, "default", targets, tail_lines=int(tail_lines), max_lines=int(max_lines))
+            st.session_state.k8s_log_tail = tail
+        if tail and st.button("⏹ Stop Streaming"):
+            tail.stop()
+            st.session_state.pop("k8s_log_tail")
+            tail = None
+
+        if tail:
+            try:
+                lines = tail.snapshot(pattern or None)
+            except re.error as e:
+                st.error(f"Invalid regex: {e}")
+                lines = []
+            st.caption(f"Following {len(tail.pod_names)} pod(s): {', '.join(tail.pod_names)} — "
+                       f"{'streaming' if tail.is_alive() else 'stream ended'}")
+            for pod, err in tail.errors.items():
+                st.warning(f"{pod}: {err}")
+            st.code("\n".join(f"{ts} [{pod}] {msg}" for ts, pod, msg in lines) or "(no log lines yet)",
+                    language="text")
+            if auto_refresh and tail.is_alive():
+                time.sleep(2)
+                st.rerun()
+
     # ---------- MENU: LIST NODES ----------
     elif menu == "List Nodes":
         st.subheader("💻 Nodes")
@@ -109,6 +756,60 @@ def run():
         except ApiException as e:
             st.error(f"Error listing deployments: {e}")
 
+    # ---------- MENU: ROLLOUT MONITOR ----------
+    elif menu == "Rollout Monitor":
+        st.subheader("🚦 Rollout Monitor")
+        try:
+            dep_list = [d.metadata.name for d in apps_v1.list_namespaced_deployment(namespace="default").items]
+        except ApiException as e:
+            st.error(f"Error listing deployments: {e}")
+            dep_list = []
+        dep_name = st.selectbox("Select Deployment", dep_list)
+        auto_refresh = st.checkbox("Auto-refresh every 2s", value=True)
+
+        monitor = st.session_state.get("k8s_rollout_monitor")
+        if st.button("▶️ Watch Rollout", disabled=not dep_name):
+            if monitor:
+                monitor.stop()
+            try:
+                monitor = RolloutMonitor(v1, apps_v1, dep_name)
+                st.session_state.k8s_rollout_monitor = monitor
+            except ApiException as e:
+                st.error(f"Error reading deployment: {e}")
+                monitor = None
+        if monitor and st.button("⏹ Stop Watching"):
+            monitor.stop()
+            st.session_state.pop("k8s_rollout_monitor")
+            monitor = None
+
+        if monitor:
+            status = monitor.status()
+            st.caption(f"Watching '{monitor.name}' — {'live' if monitor.is_alive() else 'stopped'}")
+            st.progress(min(status["progress"], 1.0))
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("Desired", status["desired"])
+            col2.metric("Updated", status["updated"])
+            col3.metric("Available", status["available"])
+            col4.metric("Surge", status["surge"], help=f"maxSurge: {status['max_surge']}")
+            col5.metric("Unavailable", status["unavailable"], help=f"maxUnavailable: {status['max_unavailable']}")
+            if status["complete"]:
+                st.success("✅ Rollout complete")
+            elif status["stuck_reason"]:
+                st.error(f"⛔ Rollout appears stuck: {status['stuck_reason']}")
+            else:
+                st.info("⏳ Rollout in progress")
+            for kind, err in monitor.errors.items():
+                st.warning(f"Watch on {kind}s: {err}")
+
+            st.write("**Pods**")
+            st.table(status["pods"])
+            st.write("**Timeline**")
+            timeline = monitor.events()
+            st.dataframe([dict(e, Time=e["Time"].strftime("%H:%M:%S")) for e in reversed(timeline)])
+            if auto_refresh and monitor.is_alive():
+                time.sleep(2)
+                st.rerun()
+
     # ---------- MENU: LIST SERVICES ----------
     elif menu == "List Services":
         st.subheader("🔌 Services")
@@ -1,48 +1,254 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+FEATURES = ["Humidity", "Wind_Speed", "Previous_Temp"]
+TARGET = "Today_Temp"
+DATA_PATH = os.path.join(os.path.dirname(__file__), "temp_data.csv")
+# Model state survives restarts here; override the location with DEVOPSAI_CACHE_DIR
+CACHE_DIR = os.environ.get("DEVOPSAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "devopsai"))
+STATE_PATH = os.path.join(CACHE_DIR, "linear_regression", "state.json")
+
+
+class OnlineLinearRegression:
+    """Least-squares regression kept as running sufficient statistics (XᵀX, Xᵀy) over an append-only CSV.
+
+    Only rows appended since the last update are parsed; the byte offset, statistics and
+    coefficients are persisted as JSON so a restart resumes without refitting. The file's inode
+    and a hash of the start and end of the consumed prefix detect a file replaced in place.
+    """
+    PREFIX_WINDOW = 64 * 1024
+
+    def __init__(self, data_path=DATA_PATH, state_path=STATE_PATH, features=FEATURES, target=TARGET):
+        self.data_path = data_path
+        self.state_path = state_path
+        self.features = list(features)
+        self.target = target
+        self.lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        import numpy as np
+
+        n = len(self.features) + 1  # last column is the intercept
+        self.xtx = np.zeros((n, n))
+        self.xty = np.zeros(n)
+        self.count = 0
+        self.skipped = 0
+        self.offset = 0
+        self.header = None
+        self.file_stat = None
+        self.prefix_digest = None
+        self.intercept = 0.0
+        self.coef = [0.0] * len(self.features)
+
+    def _load(self):
+        import numpy as np
+
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("features") != self.features or state.get("data_path") != os.path.abspath(self.data_path):
+            return
+        # State written before the prefix hash was recorded cannot be verified, so it is refitted
+        if "prefix_digest" not in state:
+            return
+        self.xtx = np.array(state["xtx"])
+        self.xty = np.array(state["xty"])
+        self.count = state["count"]
+        self.skipped = state["skipped"]
+        self.offset = state["offset"]
+        self.header = state["header"]
+        self.file_stat = state["file_stat"]
+        self.prefix_digest = state["prefix_digest"]
+        self._solve()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        state = {"features": self.features, "data_path": os.path.abspath(self.data_path), "count": self.count,
+                 "skipped": self.skipped, "offset": self.offset, "header": self.header, "file_stat": self.file_stat,
+                 "prefix_digest": self.prefix_digest, "xtx": self.xtx.tolist(), "xty": self.xty.tolist()}
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _solve(self):
+        import numpy as np
+
+        if self.count:
+            weights = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+            # Plain floats keep single-row predictions free of NumPy call overhead
+            self.coef = [float(w) for w in weights[:-1]]
+            self.intercept = float(weights[-1])
+
+    def partial_fit(self, X, y):
+        """Adds observations to XᵀX and Xᵀy and re-solves the (features + 1)-sized normal equations."""
+        import numpy as np
+
+        A = np.column_stack([np.asarray(X, dtype=np.float64), np.ones(len(X))])
+        self.xtx += A.T @ A
+        self.xty += A.T @ np.asarray(y, dtype=np.float64)
+        self.count += len(A)
+        self._solve()
+
+    def _prefix_hash(self, f, end):
+        """Hash of the first and last PREFIX_WINDOW bytes before `end`."""
+        digest = hashlib.sha1()
+        for start in sorted({0, max(0, end - self.PREFIX_WINDOW)}):
+            f.seek(start)
+            digest.update(f.read(min(self.PREFIX_WINDOW, end - start)))
+        return digest.hexdigest()
+
+    def refresh(self):
+        """Consumes rows appended to the data file since the last call; returns how many were added.
+
+        A file that shrank, changed its header, inode or consumed bytes is treated as rewritten and
+        refitted from scratch. Rows with missing or non-numeric values are skipped and counted.
+        """
+        import numpy as np
+        import pandas as pd
+
+        with self.lock:
+            with open(self.data_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                file_stat = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+                if file_stat == self.file_stat:
+                    return 0
+                header = f.readline().decode("utf-8", "replace").strip()
+                rewritten = (self.file_stat is None or header != self.header or stat.st_size < self.offset
+                             or stat.st_ino != self.file_stat[0]
+                             or self._prefix_hash(f, self.offset) != self.prefix_digest)
+                if rewritten:
+                    self._reset()
+                    self.header = header
+                    f.seek(0)
+                    f.readline()
+                    self.offset = f.tell()
+                f.seek(self.offset)
+                data = f.read()
+                # Only complete lines are consumed; a partially written last row waits for the next refresh
+                end = data.rfind(b"\n") + 1
+                self.offset += end
+                self.prefix_digest = self._prefix_hash(f, self.offset)
+            self.file_stat = file_stat
+            if not end:
+                if rewritten:
+                    self._save()
+                return 0
+            columns = header.split(",")
+            lines = sum(1 for line in data[:end].splitlines() if line.strip())
+            df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=columns, dtype=str, on_bad_lines="skip")
+            values = df.reindex(columns=self.features + [self.target]).apply(pd.to_numeric, errors="coerce")
+            valid = np.isfinite(values.to_numpy(dtype=np.float64)).all(axis=1)
+            if valid.any():
+                self.partial_fit(values[self.features][valid], values[self.target][valid])
+            self.skipped += lines - int(valid.sum())
+            self._save()
+            return int(valid.sum())
+
+    def append_observation(self, values, target):
+        """Appends one observation to the data file and folds it into the model."""
+        with open(self.data_path, "ab") as f:
+            f.write((",".join(str(v) for v in [*values, target]) + "\n").encode("utf-8"))
+        return self.refresh()
+
+    def predict_one(self, values):
+        """Single prediction in pure Python (a few hundred nanoseconds)."""
+        result = self.intercept
+        for w, v in zip(self.coef, values):
+            result += w * v
+        return result
+
+    def predict(self, X):
+        """Vectorized predictions for a 2-D array or DataFrame of feature rows."""
+        import numpy as np
+
+        return np.asarray(X, dtype=np.float64) @ np.array(self.coef) + self.intercept
+
+
+def shared_model():
+    """Factory for the process-wide online model; wrapped in st.cache_resource by the page."""
+    return OnlineLinearRegression()
+
+
 def run():
     import streamlit as st
     import pandas as pd
     import matplotlib.pyplot as plt
-    from sklearn.linear_model import LinearRegression
-    import os  # <-- 1. Import the os module
-
-    # 2. Build the full path to the data file
-    script_dir = os.path.dirname(__file__)
-    file_path = os.path.join(script_dir, "temp_data.csv")
+    import time
+    import dataset_store
 
     st.title("🌡️ Temperature Prediction")
     st.sidebar.header("Enter Weather Details")
-    
+
     # --- Sidebar Inputs (No changes here) ---
     humidity = st.sidebar.slider("Humidity (%)", 0, 100)
     wind_speed = st.sidebar.slider("Wind Speed (km/h)", 0, 50)
     previous_temp = st.sidebar.number_input("Previous Day Temp (°C)", min_value=0.0, max_value=50.0)
-    
+
     if st.sidebar.button("Submit"):
         st.write("Input Summary")
         st.write(f"Humidity: {humidity}%")
         st.write(f"Wind Speed: {wind_speed} km/h")
         st.write(f"Previous Temperature: {previous_temp} °C")
-    
+
     try:
-        # 3. Use the full file_path to read the CSV
-        df = pd.read_csv(file_path)
+        # The online model only parses rows appended since its last update (usually none)
+        model = st.cache_resource(shared_model)()
+        model.refresh()
     except FileNotFoundError:
         st.error(f"Data file not found. Make sure 'temp_data.csv' is in the 'module' folder.")
         st.stop() # Stop the app if the data can't be loaded
 
-    # --- Model Training and Prediction (No changes here) ---
-    x = df[["Humidity", "Wind_Speed", "Previous_Temp"]]
-    y = df["Today_Temp"]
-    p = LinearRegression()
-    p.fit(x, y)
-    predicted_temp = p.predict([[humidity, wind_speed, previous_temp]])
-    
+    # --- Prediction ---
+    started = time.perf_counter_ns()
+    predicted_temp = model.predict_one((humidity, wind_speed, previous_temp))
+    latency_us = (time.perf_counter_ns() - started) / 1000
+
     if st.button("Predict"):
-        st.success(f"Predicted Today's Temperature: {predicted_temp[0]:.2f} °C")
+        st.success(f"Predicted Today's Temperature: {predicted_temp:.2f} °C")
+        st.caption(f"Served in {latency_us:.1f} µs from a model fitted on {model.count} observations."
+                   + (f" {model.skipped} malformed row(s) in the data file were skipped." if model.skipped else ""))
+
+    # --- Record Observations ---
+    with st.expander("➕ Record an Observation"):
+        st.write("Append the actual temperature for the sidebar inputs; the model updates without refitting.")
+        actual_temp = st.number_input("Actual Today Temp (°C)", min_value=-50.0, max_value=60.0, value=30.0)
+        if st.button("Add Observation"):
+            model.append_observation((humidity, wind_speed, previous_temp), actual_temp)
+            st.success(f"Added. The model now uses {model.count} observations.")
+
+    # --- Batch Scenarios ---
+    with st.expander("📑 Batch Prediction from a Scenarios CSV"):
+        st.write(f"Upload a CSV with the columns {', '.join(FEATURES)}.")
+        scenarios_file = st.file_uploader("Scenarios CSV", type=["csv"])
+        if scenarios_file is not None:
+            scenarios = pd.read_csv(scenarios_file)
+            missing = [c for c in FEATURES if c not in scenarios.columns]
+            if missing:
+                st.error(f"Missing columns: {', '.join(missing)}")
+            else:
+                started = time.perf_counter()
+                scenarios["Predicted_Temp"] = model.predict(scenarios[FEATURES])
+                elapsed = time.perf_counter() - started
+                st.caption(f"Predicted {len(scenarios):,} scenarios in {elapsed * 1000:.2f} ms.")
+                st.dataframe(scenarios, use_container_width=True)
+                st.download_button("📥 Download Scenario Predictions", data=scenarios.to_csv(index=False).encode('utf-8'),
+                                   file_name="scenario_predictions.csv", mime="text/csv")
 
     # --- Graphing and Download (No changes here) ---
     st.header("📊 View Historical Data Graph?")
     if st.button("Yes"):
+        manifest = dataset_store.ingest(DATA_PATH, "temp_data.csv")
+        df = dataset_store.load_frame(manifest["key"])
         st.subheader("Temperature vs Humidity and Wind Speed")
         fig, ax = plt.subplots()
         scatter = ax.scatter(df["Humidity"], df["Wind_Speed"], c=df["Today_Temp"], cmap='coolwarm', s=100)
@@ -51,12 +257,12 @@ def run():
         cbar = plt.colorbar(scatter)
         cbar.set_label("Today Temp (°C)")
         st.pyplot(fig)
-        
+
     result_df = pd.DataFrame({
         "Humidity": [humidity],
         "Wind Speed": [wind_speed],
         "Previous Temp": [previous_temp],
-        "Predicted Temp": [predicted_temp[0]]
+        "Predicted Temp": [predicted_temp]
     })
     csv = result_df.to_csv(index=False).encode('utf-8')
-    st.download_button("📥 Download Prediction as CSV", data=csv, file_name="prediction.csv", mime="text/csv")
\ No newline at end of file
+    st.download_button("📥 Download Prediction as CSV", data=csv, file_name="prediction.csv", mime="text/csv")
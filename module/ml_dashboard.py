@@ -4,15 +4,18 @@ import numpy as np
 from sklearn.impute import SimpleImputer, KNNImputer
 from sklearn.experimental import enable_iterative_imputer
 from sklearn.impute import IterativeImputer
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.preprocessing import LabelEncoder
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import random
+import hashlib
+import os
+import time
+import batch_scoring
+import dataset_store
+import model_registry
 
 
 
@@ -24,15 +27,14 @@ if 'current_section' not in st.session_state:
 @st.cache_data
 def create_enhanced_dataset(n_samples=150):
     np.random.seed(123)
-    random.seed(123)
     
     # More diverse data with realistic correlations
     data = {
         'Employee_Age': np.random.gamma(2, 20, n_samples),  # Gamma distribution for age
         'Annual_Income': np.random.lognormal(10.5, 0.4, n_samples),  # Log-normal for income
         'Years_Experience': np.random.exponential(8, n_samples),  # Exponential for experience
-        'Education_Level': [random.choice(['Bachelor', 'Master', 'PhD', 'High School']) for _ in range(n_samples)],
-        'Work_Location': [random.choice(['Remote', 'Hybrid', 'Office', 'Field']) for _ in range(n_samples)],
+        'Education_Level': pd.Categorical(np.random.choice(['Bachelor', 'Master', 'PhD', 'High School'], n_samples)),
+        'Work_Location': pd.Categorical(np.random.choice(['Remote', 'Hybrid', 'Office', 'Field'], n_samples)),
         'Job_Satisfaction': np.random.beta(2, 1, n_samples) * 10,  # Beta distribution scaled to 0-10
         'Productivity_Score': np.random.normal(78, 12, n_samples)
     }
@@ -57,6 +59,219 @@ def create_enhanced_dataset(n_samples=150):
     
     return df
 
+IMPUTATION_METHODS = {
+    "Forward Fill": "Propagates last valid observation forward",
+    "Backward Fill": "Uses next valid observation to fill gaps",
+    "Linear Interpolation": "Estimates values using linear interpolation",
+    "KNN (k=5)": "Uses 5 nearest neighbors for imputation",
+    "Iterative (MICE)": "Multiple Imputation by Chained Equations"
+}
+DATASET_SIZES = [150, 10_000, 100_000, 1_000_000]
+# Above this many rows, model-based imputers are fitted on a sample and applied in chunks
+LARGE_DATA_ROWS = 50_000
+REFERENCE_SAMPLE_ROWS = 10_000
+KNN_MAX_DONORS = 200_000
+IMPUTE_CHUNK_ROWS = 50_000
+HEATMAP_ROWS = 500
+
+
+def dataset_fingerprint(df):
+    """Content hash of a DataFrame, used to key cached fits."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()
+
+
+def fit_pattern_knn(values, max_donors=KNN_MAX_DONORS, seed=123):
+    """Builds one KD-tree per missingness pattern over the rows that can donate to it.
+
+    Like KNNImputer, a donor only needs the pattern's missing columns observed. Distances use
+    the pattern's observed columns, with the donors' own gaps there filled by column means so
+    each pattern is an ordinary Euclidean tree query. Patterns without donors (and rows with
+    nothing observed) fall back to the column means.
+    """
+    from sklearn.neighbors import KDTree
+
+    missing = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        counts = (~missing).sum(axis=0)
+        means = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+    patterns, inverse = np.unique(missing, axis=0, return_inverse=True)
+    rng = np.random.default_rng(seed)
+    models = {}
+    for i, pattern in enumerate(patterns):
+        if not pattern.any() or pattern.all():
+            continue
+        candidates = np.flatnonzero(~missing[:, pattern].any(axis=1))
+        if not len(candidates):
+            continue
+        if len(candidates) > max_donors:
+            candidates = np.sort(rng.choice(candidates, max_donors, replace=False))
+        features = values[np.ix_(candidates, ~pattern)]
+        features = np.where(np.isnan(features), means[~pattern], features)
+        models[i] = (KDTree(features), values[np.ix_(candidates, pattern)])
+    return patterns, inverse.ravel(), models, means
+
+
+def transform_pattern_knn(values, patterns, inverse, models, means, n_neighbors=5, chunk_rows=IMPUTE_CHUNK_ROWS):
+    """Fills each row's gaps with the mean of its nearest donors, querying the trees chunk by chunk."""
+    filled = values.copy()
+    for i, pattern in enumerate(patterns):
+        if not pattern.any():
+            continue
+        rows = np.flatnonzero(inverse == i)
+        if i not in models:
+            filled[np.ix_(rows, pattern)] = means[pattern]
+            continue
+        tree, targets = models[i]
+        for start in range(0, len(rows), chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            _, neighbors = tree.query(values[chunk][:, ~pattern], k=min(n_neighbors, len(targets)))
+            filled[np.ix_(chunk, pattern)] = targets[neighbors].mean(axis=1)
+    return filled
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def fit_imputation(dataset_hash, method, large_data, _frame):
+    """Fits an imputer and fills the numeric frame; cached per (dataset hash, method, mode).
+
+    In large-data mode KNN queries per-pattern KD-trees over each pattern's donor rows instead of the
+    brute-force O(n²) search, MICE is fitted on a random reference sample, and only the rows with
+    gaps are transformed, chunk by chunk.
+    Returns (imputed DataFrame, timings dict). Callers must not mutate the returned frame.
+    """
+    started = time.perf_counter()
+    timings = {"Method": method, "Rows": len(_frame), "Large-Data Mode": large_data}
+    if method == "Forward Fill":
+        imputed = _frame.ffill()
+    elif method == "Backward Fill":
+        imputed = _frame.bfill()
+    elif method == "Linear Interpolation":
+        imputed = _frame.interpolate(method='linear')
+    elif method == "KNN (k=5)" and large_data:
+        values = _frame.to_numpy(dtype=np.float64)
+        fitted = fit_pattern_knn(values)
+        timings["Fit (s)"] = round(time.perf_counter() - started, 3)
+        imputed = pd.DataFrame(transform_pattern_knn(values, *fitted, n_neighbors=5),
+                               columns=_frame.columns, index=_frame.index)
+    else:
+        if method == "KNN (k=5)":
+            imputer = KNNImputer(n_neighbors=5, keep_empty_features=True)
+        else:
+            # A column that is all-NaN in the reference sample must be kept, or the filled rows lose a column
+            imputer = IterativeImputer(max_iter=15, random_state=123, keep_empty_features=True)
+        values = _frame.to_numpy(dtype=np.float64)
+        reference = values
+        if large_data and len(values) > REFERENCE_SAMPLE_ROWS:
+            rows = np.random.default_rng(123).choice(len(values), REFERENCE_SAMPLE_ROWS, replace=False)
+            reference = values[rows]
+        imputer.fit(reference)
+        timings["Fit (s)"] = round(time.perf_counter() - started, 3)
+        # Complete rows pass through unchanged, so only rows with gaps are transformed
+        filled = values.copy()
+        gap_rows = np.flatnonzero(np.isnan(values).any(axis=1))
+        chunk = IMPUTE_CHUNK_ROWS if large_data else max(len(gap_rows), 1)
+        for start in range(0, len(gap_rows), chunk):
+            rows = gap_rows[start:start + chunk]
+            filled[rows] = imputer.transform(values[rows])
+        imputed = pd.DataFrame(filled, columns=_frame.columns, index=_frame.index)
+    timings.setdefault("Fit (s)", 0.0)
+    timings["Total (s)"] = round(time.perf_counter() - started, 3)
+    timings["Transform (s)"] = round(timings["Total (s)"] - timings["Fit (s)"], 3)
+    return imputed, timings
+
+
+SAMPLE_DATASET = "🧪 Sample (synthetic)"
+# Pages work on at most this many rows, sampled from the memory-mapped dataset
+MAX_WORKING_ROWS = 200_000
+SCATTER_ROWS = 5_000
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_working_frame(key, max_rows=MAX_WORKING_ROWS):
+    """Row-sampled pandas view of an ingested dataset; shared across reruns, so do not mutate it."""
+    return dataset_store.load_frame(key, max_rows=max_rows)
+
+
+def active_dataset():
+    """(DataFrame, manifest) for the dataset picked in the sidebar; the manifest is None for the sample."""
+    key = st.session_state.get('ml_dataset_key')
+    if key:
+        try:
+            return load_working_frame(key), dataset_store.load_manifest(key)
+        except (OSError, ValueError):
+            st.session_state.ml_dataset_key = None
+    return create_enhanced_dataset(), None
+
+
+def numeric_columns(df):
+    return [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+def categorical_columns(df, max_unique=50):
+    return [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c]) and df[c].nunique() <= max_unique]
+
+
+def default_index(options, preferred):
+    return options.index(preferred) if preferred in options else 0
+
+
+def shared_model_registry():
+    """Factory for the process-wide model registry; wrapped in st.cache_resource by the pages."""
+    return model_registry.ModelRegistry()
+
+
+def fetch_or_train(slot, spec, frame, X_train, y_train, X_eval, y_eval, n_jobs=1):
+    """Returns (entry, status) for a model spec, training it in the background on a registry miss.
+
+    While a model trains, the last ready model shown in this `slot` is returned so the page keeps
+    rendering; status is 'ready', 'training' or an error message. A failed model is retried on the
+    next call.
+    """
+    registry = st.cache_resource(shared_model_registry)()
+    key = model_registry.model_key(dataset_fingerprint(frame), spec)
+    entry = registry.get(key)
+    if entry is not None:
+        st.session_state[f'model_slot_{slot}'] = key
+        return entry, "ready"
+    status = registry.submit(key, spec, X_train, y_train, X_eval, y_eval, n_jobs=n_jobs)
+    if status == "failed":
+        return None, registry.error(key) or "training failed in another session"
+    previous = st.session_state.get(f'model_slot_{slot}')
+    return (registry.get(previous) if previous else None), "training"
+
+
+def display_registry_status():
+    with st.expander("🗄️ Model Registry"):
+        st.table([st.cache_resource(shared_model_registry)().telemetry()])
+
+
+def display_dataset_picker():
+    """Sidebar controls to upload or ingest a CSV/Parquet file and choose the active dataset."""
+    st.markdown("### 📂 Dataset")
+    datasets = {f"{m['name']} ({m['rows']:,} rows)": m['key'] for m in dataset_store.list_datasets()}
+    options = [SAMPLE_DATASET] + list(datasets)
+    current = next((label for label, key in datasets.items() if key == st.session_state.get('ml_dataset_key')),
+                   SAMPLE_DATASET)
+    choice = st.selectbox("Active dataset:", options, index=options.index(current))
+    st.session_state.ml_dataset_key = datasets.get(choice)
+
+    with st.expander("➕ Add Dataset"):
+        uploaded = st.file_uploader("CSV or Parquet file", type=["csv", "parquet"])
+        local_path = st.text_input("...or a file path on this server", help="For files too large to upload.")
+        if st.button("📥 Ingest"):
+            source, name = (uploaded, uploaded.name) if uploaded else (local_path, os.path.basename(local_path))
+            if not uploaded and not os.path.isfile(local_path):
+                st.error("Choose a file to upload or enter an existing path.")
+            else:
+                with st.spinner(f"Ingesting {name}..."):
+                    try:
+                        manifest = dataset_store.ingest(source, name)
+                    except Exception as e:
+                        st.error(f"Could not ingest {name}: {e}")
+                    else:
+                        st.session_state.ml_dataset_key = manifest['key']
+                        st.rerun()
+
+
 def display_missing_value_techniques():
     st.header("🔧 Advanced Missing Data Handling")
     st.markdown("""
@@ -64,7 +279,24 @@ def display_missing_value_techniques():
     Each method has different assumptions and use cases.
     """)
     
-    df = create_enhanced_dataset()
+    df, manifest = active_dataset()
+    if manifest is None:
+        n_samples = st.select_slider("📦 Dataset Size (rows):", DATASET_SIZES, value=DATASET_SIZES[0],
+                                     format_func=lambda n: f"{n:,}")
+        df = create_enhanced_dataset(n_samples)
+        numerical_features = ['Employee_Age', 'Annual_Income', 'Years_Experience']
+    else:
+        candidates = numeric_columns(df)
+        with_gaps = [c for c in candidates if df[c].isna().any()]
+        numerical_features = st.multiselect("🔢 Columns to Impute:", candidates,
+                                            default=with_gaps or candidates[:3])
+        if not numerical_features:
+            st.info("Select at least one numeric column.")
+            return
+    large_data = len(df) > LARGE_DATA_ROWS
+    if large_data:
+        st.caption(f"Large-data mode: KNN queries KD-trees over complete donor rows, MICE is fitted on a "
+                   f"{REFERENCE_SAMPLE_ROWS:,}-row sample, and both are applied in {IMPUTE_CHUNK_ROWS:,}-row chunks.")
     
     col1, col2 = st.columns([1, 1])
     
@@ -83,36 +315,24 @@ def display_missing_value_techniques():
         st.dataframe(missing_df[missing_df['Missing Count'] > 0])
     
     with col2:
-        # Imputation method selection with descriptions
-        method_descriptions = {
-            "Forward Fill": "Propagates last valid observation forward",
-            "Backward Fill": "Uses next valid observation to fill gaps",
-            "Linear Interpolation": "Estimates values using linear interpolation",
-            "KNN (k=5)": "Uses 5 nearest neighbors for imputation",
-            "Iterative (MICE)": "Multiple Imputation by Chained Equations"
-        }
-        
         selected_method = st.selectbox("🎯 Choose Imputation Strategy:", 
-                                     list(method_descriptions.keys()))
-        
-        st.info(f"**{selected_method}:** {method_descriptions[selected_method]}")
-    
-    # Apply selected imputation
-    numerical_features = ['Employee_Age', 'Annual_Income', 'Years_Experience']
-    processed_df = df.copy()
-    
-    if selected_method == "Forward Fill":
-        processed_df[numerical_features] = df[numerical_features].fillna(method='ffill')
-    elif selected_method == "Backward Fill":
-        processed_df[numerical_features] = df[numerical_features].fillna(method='bfill')
-    elif selected_method == "Linear Interpolation":
-        processed_df[numerical_features] = df[numerical_features].interpolate(method='linear')
-    elif selected_method == "KNN (k=5)":
-        imputer = KNNImputer(n_neighbors=5)
-        processed_df[numerical_features] = imputer.fit_transform(df[numerical_features])
-    elif selected_method == "Iterative (MICE)":
-        imputer = IterativeImputer(max_iter=15, random_state=123)
-        processed_df[numerical_features] = imputer.fit_transform(df[numerical_features])
+                                     list(IMPUTATION_METHODS.keys()))
+        
+        st.info(f"**{selected_method}:** {IMPUTATION_METHODS[selected_method]}")
+    
+    # Apply selected imputation (fits are cached per dataset hash and method)
+    dataset_hash = dataset_fingerprint(df[numerical_features])
+    timings_log = st.session_state.setdefault('imputation_timings', {})
+    
+    def impute(method):
+        started = time.perf_counter()
+        imputed, timings = fit_imputation(dataset_hash, method, large_data, df[numerical_features])
+        timings_log[(dataset_hash, method)] = dict(timings, **{"Last Call (s)": round(time.perf_counter() - started, 3)})
+        return imputed
+    
+    with st.spinner(f"Applying {selected_method}..."):
+        processed_df = df.copy()
+        processed_df[numerical_features] = impute(selected_method)
     
     # Interactive visualization
     fig = make_subplots(rows=1, cols=2, 
@@ -120,7 +340,7 @@ def display_missing_value_techniques():
                        specs=[[{"secondary_y": False}, {"secondary_y": False}]])
     
     # Before imputation heatmap
-    missing_before = df[numerical_features].isnull().astype(int)
+    missing_before = df[numerical_features].head(HEATMAP_ROWS).isnull().astype(int)
     fig.add_trace(go.Heatmap(z=missing_before.values.T, 
                             x=missing_before.index, 
                             y=missing_before.columns,
@@ -128,15 +348,29 @@ def display_missing_value_techniques():
                             showscale=False), row=1, col=1)
     
     # After imputation heatmap
-    missing_after = processed_df[numerical_features].isnull().astype(int)
+    missing_after = processed_df[numerical_features].head(HEATMAP_ROWS).isnull().astype(int)
     fig.add_trace(go.Heatmap(z=missing_after.values.T, 
                             x=missing_after.index, 
                             y=missing_after.columns,
                             colorscale='Reds',
                             showscale=True), row=1, col=2)
     
-    fig.update_layout(height=400, title_text=f"Missing Value Pattern - {selected_method}")
+    title = f"Missing Value Pattern - {selected_method}"
+    if len(df) > HEATMAP_ROWS:
+        title += f" (first {HEATMAP_ROWS} rows)"
+    fig.update_layout(height=400, title_text=title)
     st.plotly_chart(fig, use_container_width=True)
+    
+    # Per-method timings
+    st.subheader("⏱️ Imputation Timings")
+    if st.button("Benchmark All Methods"):
+        with st.spinner("Running every imputation method..."):
+            for method in IMPUTATION_METHODS:
+                impute(method)
+    timing_rows = [row for (h, _), row in timings_log.items() if h == dataset_hash]
+    st.dataframe(pd.DataFrame(timing_rows), use_container_width=True)
+    st.caption("Fit/Transform/Total are measured on the first fit; later calls with the same data and method "
+               "are served from the cache, as 'Last Call' shows.")
 
 def display_encoding_analysis():
     st.header("🏷️ Categorical Encoding & Feature Engineering")
@@ -144,7 +378,11 @@ def display_encoding_analysis():
     Compare different encoding strategies and their impact on model performance.
     """)
     
-    df = create_enhanced_dataset().dropna()
+    df, _ = active_dataset()
+    categorical_options = categorical_columns(df)
+    if not categorical_options:
+        st.info("The active dataset has no categorical columns (text columns with at most 50 distinct values).")
+        return
     
     # Encoding options
     encoding_methods = {
@@ -160,7 +398,17 @@ def display_encoding_analysis():
         selected_encoding = st.selectbox("🎨 Encoding Strategy:", list(encoding_methods.keys()))
         st.info(encoding_methods[selected_encoding])
         
-        categorical_col = st.selectbox("📝 Categorical Column:", ['Education_Level', 'Work_Location'])
+        categorical_col = st.selectbox("📝 Categorical Column:", categorical_options)
+        target_options = numeric_columns(df)
+        target_col = None
+        if selected_encoding == "Target Encoding":
+            if not target_options:
+                st.warning("Target encoding needs a numeric target column.")
+                return
+            target_col = st.selectbox("🏆 Target Variable:", target_options,
+                                      index=default_index(target_options, 'Productivity_Score'))
+    
+    df = df.dropna(subset=[categorical_col] + ([target_col] if target_col else []))
     
     with col2:
         st.subheader("📈 Original Distribution")
@@ -188,7 +436,7 @@ def display_encoding_analysis():
         encoding_result = encoded_data.head(10)
         
     elif selected_encoding == "Target Encoding":
-        target_means = df.groupby(categorical_col)['Productivity_Score'].mean()
+        target_means = df.groupby(categorical_col, observed=True)[target_col].mean()
         encoded_df[f'{categorical_col}_TargetEncoded'] = df[categorical_col].map(target_means)
         encoding_result = pd.DataFrame({
             categorical_col: target_means.index,
@@ -204,70 +452,156 @@ def display_model_initialization():
     Explore how different initialization strategies affect model convergence and performance.
     """)
     
-    df = create_enhanced_dataset().dropna()
+    df, _ = active_dataset()
+    target_options = numeric_columns(df)
+    if len(target_options) < 2:
+        st.info("Model training needs at least two numeric columns (features and a target).")
+        return
+    
+    mode = st.radio("Mode:", ["Single Model", "Hyperparameter Sweep"], horizontal=True)
+    cpu_count = os.cpu_count() or 1
     
     # Model configuration
     col1, col2 = st.columns([1, 1])
     
     with col1:
         st.subheader("🎛️ Model Configuration")
-        model_type = st.selectbox("🤖 Model Type:", 
-                                 ["Random Forest", "Gradient Boosting", "Linear Model"])
+        model_type = st.selectbox("🤖 Model Type:", model_registry.MODEL_TYPES)
         
-        n_estimators = st.slider("🌳 Number of Estimators:", 10, 200, 100, 10)
-        max_depth = st.slider("📏 Max Depth:", 3, 20, 10)
+        params = {}
+        if mode == "Single Model":
+            if model_type == "Linear Model":
+                params["alpha"] = st.select_slider("⚖️ Ridge Alpha:", [0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, 100.0], 1.0)
+            else:
+                params["n_estimators"] = st.slider("🌳 Number of Estimators:", 10, 200, 100, 10)
+                if model_type == "Gradient Boosting":
+                    params["max_depth"] = st.slider("📏 Max Depth:", 1, 10, 3)
+                    params["learning_rate"] = st.select_slider("📈 Learning Rate:", [0.01, 0.02, 0.05, 0.1, 0.2, 0.5], 0.1)
+                else:
+                    params["max_depth"] = st.slider("📏 Max Depth:", 3, 20, 10)
+            n_jobs = st.number_input("🧵 Training n_jobs:", 1, cpu_count, min(4, cpu_count),
+                                     help="Cores each background training job may use.")
         random_seed = st.slider("🎲 Random Seed:", 1, 1000, 123)
     
     with col2:
         st.subheader("📊 Feature Selection")
-        available_features = ['Employee_Age', 'Annual_Income', 'Years_Experience', 'Job_Satisfaction']
+        target_var = st.selectbox("🏆 Target Variable:", target_options,
+                                  index=default_index(target_options, 'Productivity_Score'))
+        available_features = [c for c in target_options if c != target_var]
         selected_features = st.multiselect("🎯 Input Features:", 
                                          available_features, 
                                          default=available_features[:3])
-        
-        target_var = st.selectbox("🏆 Target Variable:", ['Productivity_Score'])
     
-    if selected_features:
+    if selected_features and mode == "Hyperparameter Sweep":
+        df = df[selected_features + [target_var]].dropna()
+        base_spec = {"model_type": model_type, "features": selected_features, "target": target_var,
+                     "scale": True, "seed": random_seed}
+        display_hyperparameter_sweep(base_spec, df[selected_features], df[target_var], cpu_count)
+    elif selected_features:
         # Prepare data
+        df = df[selected_features + [target_var]].dropna()
         X = df[selected_features]
         y = df[target_var]
         
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        X_scaled = pd.DataFrame(X_scaled, columns=selected_features)
-        
-        # Train model
-        if model_type == "Random Forest":
-            model = RandomForestRegressor(n_estimators=n_estimators, 
-                                        max_depth=max_depth, 
-                                        random_state=random_seed)
-        model.fit(X_scaled, y)
-        
-        # Model performance
-        y_pred = model.predict(X_scaled)
-        mse = mean_squared_error(y, y_pred)
-        r2 = r2_score(y, y_pred)
+        # Features are standardized inside the model pipeline; the registry only retrains on new inputs
+        spec = {"model_type": model_type, "features": selected_features, "target": target_var, "scale": True,
+                "params": params, "seed": random_seed}
+        entry, status = fetch_or_train("initialization", spec, df, X, y, X, y, n_jobs=int(n_jobs))
+        if status == "training":
+            st.info("⏳ Training in the background" +
+                    (" — showing the previous model until it finishes." if entry else "..."))
+        elif status != "ready":
+            st.error(f"Training failed: {status}")
+        display_registry_status()
+        if entry is None:
+            if status == "training":
+                time.sleep(1)
+                st.rerun()
+            return
+        _, meta = entry
         
         # Display results
         col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
-            st.metric("📈 R² Score", f"{r2:.3f}")
+            st.metric("📈 R² Score", f"{meta['r2']:.3f}")
         with col2:
-            st.metric("📉 MSE", f"{mse:.2f}")
+            st.metric("📉 MSE", f"{meta['mse']:.2f}")
         with col3:
-            st.metric("🎯 Features", len(selected_features))
+            st.metric("⏱️ Train Time", f"{meta['train_seconds']:.2f}s")
         
         # Feature importance visualization
-        if hasattr(model, 'feature_importances_'):
+        if meta['feature_importances'] is not None:
             importance_df = pd.DataFrame({
-                'Feature': selected_features,
-                'Importance': model.feature_importances_
+                'Feature': meta['spec']['features'],
+                'Importance': meta['feature_importances']
             }).sort_values('Importance', ascending=True)
             
             fig_importance = px.bar(importance_df, x='Importance', y='Feature', 
                                   orientation='h', title="Feature Importance")
             st.plotly_chart(fig_importance, use_container_width=True)
+        
+        if status == "training":
+            time.sleep(1)
+            st.rerun()
+
+def display_hyperparameter_sweep(base_spec, X, y, cpu_count):
+    """Grid/random search with k-fold CV in a process pool, successive halving and a live leaderboard."""
+    space = model_registry.PARAM_SPACES[base_spec["model_type"]]
+    st.subheader("🔭 Search Space")
+    ranges = {}
+    cols = st.columns(len(space))
+    for col, (name, (low, high, scale)) in zip(cols, space.items()):
+        if scale == "int":
+            ranges[name] = (*col.slider(f"{name}:", low, high, (low, high)), scale)
+        else:
+            options = [float(f"{v:.4g}") for v in np.geomspace(low, high, 13)]
+            ranges[name] = (*col.select_slider(f"{name}:", options, (options[0], options[-1])), scale)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    search = col1.radio("Search:", ["Random", "Grid"])
+    if search == "Random":
+        n_configs = col2.number_input("Configurations:", 2, 1000, 200)
+        configs = model_registry.sample_configs(ranges, "random", n_configs=int(n_configs), seed=base_spec["seed"])
+    else:
+        steps = col2.number_input("Values per parameter:", 2, 20, 5)
+        configs = model_registry.sample_configs(ranges, "grid", grid_steps=int(steps))
+    n_folds = col3.slider("CV folds:", 2, 10, 5)
+    workers = col4.number_input("Worker processes:", 1, cpu_count, cpu_count)
+    halving = st.checkbox("✂️ Successive halving (stop the worst configurations early)", value=True)
+    eta = st.slider("Keep 1 in every N configurations per rung:", 2, 5, 3) if halving else 3
+    
+    budgets = model_registry.halving_schedule(len(configs), len(X), eta, n_folds * 20) if halving else [len(X)]
+    st.caption(f"{len(configs)} configurations · {len(budgets)} rung(s) with "
+               f"{', '.join(f'{b:,}' for b in budgets)} rows · {n_folds}-fold CV")
+    
+    if st.button("🚀 Run Sweep"):
+        progress = st.progress(0.0)
+        table = st.empty()
+        started = time.perf_counter()
+        for board, finished, total in model_registry.run_sweep(base_spec, configs, X, y, n_folds=n_folds,
+                                                                halving=halving, eta=eta, max_workers=int(workers),
+                                                                seed=base_spec["seed"]):
+            progress.progress(min(finished / max(total, 1), 1.0),
+                              text=f"{finished}/{total} fold fits · {time.perf_counter() - started:.1f}s")
+            table.dataframe(pd.DataFrame(board).head(25), use_container_width=True)
+        st.session_state.sweep_results = {"spec": base_spec, "board": board,
+                                          "seconds": round(time.perf_counter() - started, 1)}
+        progress.empty()
+        table.empty()
+    
+    results = st.session_state.get('sweep_results')
+    if results and results["spec"] == base_spec:
+        board = pd.DataFrame(results["board"])
+        best = board.iloc[0]
+        if pd.isna(best["CV R²"]):
+            st.error(f"Every configuration failed: {best['Status']}")
+            return
+        st.success(f"Sweep finished in {results['seconds']}s. Best CV R² {best['CV R²']:.4f} with "
+                   + ", ".join(f"{name}={best[name]}" for name in space))
+        st.dataframe(board, use_container_width=True)
+        fig = px.scatter(board.dropna(subset=["CV R²"]), x="Fit Time (s)", y="CV R²", color="Status",
+                         hover_data=list(space), title="Accuracy vs. Cost per Configuration")
+        st.plotly_chart(fig, use_container_width=True)
 
 def display_advanced_analytics():
     st.header("🧠 Advanced AI Analytics")
@@ -275,14 +609,17 @@ def display_advanced_analytics():
     Sophisticated analysis using modern machine learning techniques and interactive visualizations.
     """)
     
-    df = create_enhanced_dataset().dropna()
+    df, _ = active_dataset()
+    numerical_cols = numeric_columns(df)
+    if len(numerical_cols) < 2:
+        st.info("These analyses need at least two numeric columns.")
+        return
     
     # Analytics options
     analysis_type = st.selectbox("🔬 Analysis Type:", 
                                ["Correlation Analysis", "Performance Clustering", "Predictive Modeling"])
     
     if analysis_type == "Correlation Analysis":
-        numerical_cols = df.select_dtypes(include=[np.number]).columns
         correlation_matrix = df[numerical_cols].corr()
         
         fig_corr = px.imshow(correlation_matrix, 
@@ -292,23 +629,39 @@ def display_advanced_analytics():
         st.plotly_chart(fig_corr, use_container_width=True)
         
     elif analysis_type == "Performance Clustering":
+        col1, col2, col3, col4 = st.columns(4)
+        score_col = col1.selectbox("🏆 Segment By:", numerical_cols,
+                                   index=default_index(numerical_cols, 'Productivity_Score'))
+        x_col = col2.selectbox("↔️ X Axis:", numerical_cols, index=default_index(numerical_cols, 'Annual_Income'))
+        y_col = col3.selectbox("↕️ Y Axis:", numerical_cols, index=default_index(numerical_cols, 'Job_Satisfaction'))
+        size_options = ["(none)"] + numerical_cols
+        size_col = col4.selectbox("⚪ Marker Size:", size_options, index=default_index(size_options, 'Years_Experience'))
+        used = list(dict.fromkeys([score_col, x_col, y_col] + ([size_col] if size_col != "(none)" else [])))
+        hover_cols = [c for c in numerical_cols if c not in used][:2]
+        df = df[used + hover_cols].dropna()
+        if len(df) > SCATTER_ROWS:
+            df = df.sample(SCATTER_ROWS, random_state=123)
+        
         # Create performance segments
-        df['Performance_Segment'] = pd.cut(df['Productivity_Score'], 
+        df['Performance_Segment'] = pd.cut(df[score_col], 
                                          bins=3, 
                                          labels=['Low', 'Medium', 'High'])
         
-        fig_scatter = px.scatter(df, x='Annual_Income', y='Job_Satisfaction',
+        fig_scatter = px.scatter(df, x=x_col, y=y_col,
                                color='Performance_Segment',
-                               size='Years_Experience',
+                               size=size_col if size_col != "(none)" and (df[size_col] >= 0).all() else None,
                                title="Performance Clustering Analysis",
-                               hover_data=['Employee_Age'])
+                               hover_data=hover_cols)
         st.plotly_chart(fig_scatter, use_container_width=True)
         
     elif analysis_type == "Predictive Modeling":
         # Train-test simulation
-        feature_cols = ['Employee_Age', 'Annual_Income', 'Years_Experience', 'Job_Satisfaction']
+        target_col = st.selectbox("🏆 Target Variable:", numerical_cols,
+                                  index=default_index(numerical_cols, 'Productivity_Score'))
+        feature_cols = [c for c in numerical_cols if c != target_col]
+        df = df[feature_cols + [target_col]].dropna()
         X = df[feature_cols]
-        y = df['Productivity_Score']
+        y = df[target_col]
         
         # Add noise for simulation
         X_train = X.sample(frac=0.8, random_state=123)
@@ -316,18 +669,32 @@ def display_advanced_analytics():
         y_train = y.loc[X_train.index]
         y_test = y.loc[X_test.index]
         
-        # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=123)
-        model.fit(X_train, y_train)
+        # Train model (cached in the registry, trained in the background on a miss)
+        spec = {"model_type": "Random Forest", "features": feature_cols, "target": target_col, "scale": False,
+                "params": {"n_estimators": 100}, "seed": 123, "holdout": 0.2}
+        entry, status = fetch_or_train("analytics", spec, df, X_train, y_train, X_test, y_test,
+                                       n_jobs=os.cpu_count() or 1)
+        display_registry_status()
+        if status == "training":
+            # Predictions of an older model would not line up with this holdout, so wait for the new one
+            st.info("⏳ Training the model in the background...")
+            time.sleep(1)
+            st.rerun()
+        elif status not in ("ready", "training"):
+            st.error(f"Training failed: {status}")
+            return
         
-        # Predictions
-        y_pred = model.predict(X_test)
+        # Predictions were made on the holdout rows when the model was trained
+        _, meta = entry
+        y_pred = meta['predictions']
         
         # Prediction vs Actual plot
         pred_df = pd.DataFrame({
-            'Actual': y_test,
+            'Actual': y_test.to_numpy(),
             'Predicted': y_pred
         })
+        if len(pred_df) > SCATTER_ROWS:
+            pred_df = pred_df.sample(SCATTER_ROWS, random_state=123)
         
         fig_pred = px.scatter(pred_df, x='Actual', y='Predicted',
                             title="Prediction vs Actual Performance",
@@ -339,68 +706,239 @@ def display_advanced_analytics():
                           line=dict(color="red", dash="dash"))
         st.plotly_chart(fig_pred, use_container_width=True)
 
+def _quadratic(p):
+    x, y = p[:, 0], p[:, 1]
+    return x ** 2 + 10 * y ** 2, np.stack([2 * x, 20 * y], axis=1)
+
+
+def _rosenbrock(p):
+    x, y = p[:, 0], p[:, 1]
+    return (1 - x) ** 2 + 100 * (y - x ** 2) ** 2, np.stack([-2 * (1 - x) - 400 * x * (y - x ** 2),
+                                                             200 * (y - x ** 2)], axis=1)
+
+
+def _beale(p):
+    x, y = p[:, 0], p[:, 1]
+    a, b, c = 1.5 - x + x * y, 2.25 - x + x * y ** 2, 2.625 - x + x * y ** 3
+    grad_x = 2 * a * (y - 1) + 2 * b * (y ** 2 - 1) + 2 * c * (y ** 3 - 1)
+    grad_y = 2 * a * x + 4 * b * x * y + 6 * c * x * y ** 2
+    return a ** 2 + b ** 2 + c ** 2, np.stack([grad_x, grad_y], axis=1)
+
+
+# (loss-and-gradient function, centre of the random starting points, minimum value)
+TEST_FUNCTIONS = {
+    "Quadratic": (_quadratic, (3.0, 2.0), 0.0),
+    "Rosenbrock": (_rosenbrock, (-1.5, 2.0), 0.0),
+    "Beale": (_beale, (1.0, 1.5), 0.0),
+}
+OPTIMIZERS = ["Adam", "SGD", "RMSprop", "AdaGrad"]
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_optimizer(optimizer, problem, learning_rates, n_seeds, steps, noise_level=0.0, eps=1e-8):
+    """Runs one optimizer for every (learning rate, seed) pair as a single batched NumPy computation.
+
+    Row i of the batch uses learning_rates[i // n_seeds] and starting point/gradient noise from
+    seed i % n_seeds. Diverged runs are frozen with infinite loss. Returns (losses of shape
+    (runs, steps + 1), wall seconds). Results are cached per argument set, so reruns that only
+    change the tolerance or the plotted optimizer reuse the last runs.
+    """
+    func, centre, _ = TEST_FUNCTIONS[problem]
+    lr = np.repeat(np.asarray(learning_rates, dtype=np.float64), n_seeds)[:, None]
+    runs = len(lr)
+    rng = np.random.default_rng(123)
+    starts = np.asarray(centre) + rng.normal(0, 0.3, (n_seeds, 2))
+    theta = np.tile(starts, (len(learning_rates), 1))
+    m = np.zeros_like(theta)
+    v = np.zeros_like(theta)
+    alive = np.ones(runs, dtype=bool)
+    losses = np.full((runs, steps + 1), np.inf)
+    
+    started = time.perf_counter()
+    with np.errstate(over='ignore', invalid='ignore'):
+        loss, grad = func(theta)
+        losses[:, 0] = loss
+        for t in range(1, steps + 1):
+            if noise_level:
+                grad = grad + rng.normal(0, noise_level, grad.shape)
+            if optimizer == "SGD":
+                step = lr * grad
+            elif optimizer == "Adam":
+                m = 0.9 * m + 0.1 * grad
+                v = 0.999 * v + 0.001 * grad ** 2
+                step = lr * (m / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + eps)
+            elif optimizer == "RMSprop":
+                v = 0.9 * v + 0.1 * grad ** 2
+                step = lr * grad / (np.sqrt(v) + eps)
+            else:  # AdaGrad
+                v = v + grad ** 2
+                step = lr * grad / (np.sqrt(v) + eps)
+            theta = np.where(alive[:, None], theta - step, theta)
+            loss, grad = func(theta)
+            alive &= np.isfinite(loss) & (loss < 1e12)
+            losses[:, t] = np.where(alive, loss, np.inf)
+    return losses, time.perf_counter() - started
+
+
+def steps_to_tolerance(losses, f_min, tolerance):
+    """First step at which each run is within tolerance of the minimum (-1 if never)."""
+    reached = (losses - f_min) <= tolerance
+    return np.where(reached.any(axis=1), reached.argmax(axis=1), -1)
+
+
 def display_optimization_playground():
     st.header("⚡ Optimization Playground")
     st.markdown("""
     Interactive exploration of optimization algorithms and their convergence patterns.
+    Every optimizer really runs on the test function, for a whole grid of learning rates and random
+    starting points at once.
     """)
     
     # Optimization parameters
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        optimizer_type = st.selectbox("🚀 Optimizer:", 
-                                    ["Adam", "SGD", "RMSprop", "AdaGrad"])
-        learning_rate = st.slider("📈 Learning Rate:", 0.001, 0.1, 0.01, 0.001)
-        epochs = st.slider("🔄 Epochs:", 10, 100, 50, 5)
+        optimizer_type = st.selectbox("🚀 Optimizer:", OPTIMIZERS)
+        lr_options = [float(f"{v:.3g}") for v in np.geomspace(1e-4, 1.0, 13)]
+        lr_low, lr_high = st.select_slider("📈 Learning Rate Range:", lr_options, (0.001, 0.1))
+        n_learning_rates = st.slider("🔢 Learning Rates in Range:", 1, 32, 8)
+        epochs = st.slider("🔄 Steps:", 10, 5000, 500, 10)
     
     with col2:
-        problem_type = st.selectbox("🎯 Problem Type:", 
-                                  ["Quadratic", "Rosenbrock", "Beale"])
-        noise_level = st.slider("🔊 Noise Level:", 0.0, 0.5, 0.1, 0.05)
+        problem_type = st.selectbox("🎯 Problem Type:", list(TEST_FUNCTIONS))
+        noise_level = st.slider("🔊 Gradient Noise:", 0.0, 0.5, 0.0, 0.05)
+        n_seeds = st.slider("🎲 Random Starts per Learning Rate:", 1, 64, 16)
+        tolerance = st.select_slider("🎯 Tolerance (loss above minimum):", [1e-8, 1e-6, 1e-4, 1e-3, 1e-2, 1e-1], 1e-4)
     
-    # Simulate optimization curves
-    np.random.seed(123)
-    x = np.arange(1, epochs + 1)
-    
-    if optimizer_type == "Adam":
-        base_curve = 1 / (0.3 * x**1.2 + 1)
-    elif optimizer_type == "SGD":
-        base_curve = 1 / (0.1 * x + 1)
-    elif optimizer_type == "RMSprop":
-        base_curve = 1 / (0.2 * x**1.1 + 1)
-    else:  # AdaGrad
-        base_curve = 1 / (0.15 * x**0.9 + 1)
-    
-    # Add noise and learning rate effect
-    noise = np.random.normal(0, noise_level, len(x))
-    loss_curve = base_curve * (1 / learning_rate) * 0.01 + noise
-    loss_curve = np.maximum(loss_curve, 0.001)  # Ensure positive values
-    
-    # Create interactive plot
-    optimization_df = pd.DataFrame({
-        'Epoch': x,
-        'Loss': loss_curve,
-        'Optimizer': optimizer_type
-    })
-    
-    fig_opt = px.line(optimization_df, x='Epoch', y='Loss', 
-                     title=f"{optimizer_type} Optimization Curve",
-                     markers=True)
+    learning_rates = np.geomspace(lr_low, lr_high, n_learning_rates) if lr_high > lr_low else np.array([lr_low])
+    f_min = TEST_FUNCTIONS[problem_type][2]
+    
+    # Every optimizer runs the full (learning rate x seed) batch so they can be compared
+    summary = []
+    curves = {}
+    for name in OPTIMIZERS:
+        losses, seconds = run_optimizer(name, problem_type, learning_rates, n_seeds, epochs, noise_level)
+        reached = steps_to_tolerance(losses, f_min, tolerance).reshape(len(learning_rates), n_seeds)
+        final = losses[:, -1].reshape(len(learning_rates), n_seeds)
+        success = (reached >= 0).mean(axis=1)
+        median_final = np.median(final, axis=1)
+        # Best learning rate: highest success rate, then lowest median final loss
+        best = int(np.lexsort((median_final, -success))[0])
+        hits = reached[best][reached[best] >= 0]
+        summary.append({
+            "Optimizer": name,
+            "Best Learning Rate": float(f"{learning_rates[best]:.4g}"),
+            "Success Rate": f"{success[best]:.0%}",
+            "Median Steps to Tolerance": int(np.median(hits)) if len(hits) else None,
+            "Median Final Loss": float(f"{median_final[best]:.4g}"),
+            "Diverged Runs": int(np.isinf(losses[:, -1]).sum()),
+            "Runs": losses.shape[0],
+            "Wall Time (ms)": round(seconds * 1000, 1),
+        })
+        curves[name] = (losses.reshape(len(learning_rates), n_seeds, -1), best)
+    
+    st.subheader("🏁 Optimizer Comparison")
+    st.dataframe(pd.DataFrame(summary), use_container_width=True)
+    
+    # Median loss curve per learning rate for the selected optimizer
+    losses, best = curves[optimizer_type]
+    x = np.arange(epochs + 1)
+    stride = max(1, len(x) // 500)
+    curve_rows = []
+    for i, lr in enumerate(learning_rates):
+        median = np.median(losses[i], axis=0)
+        curve_rows.append(pd.DataFrame({'Step': x[::stride], 'Loss': median[::stride] - f_min + 1e-12,
+                                        'Learning Rate': f"{lr:.4g}"}))
+    optimization_df = pd.concat(curve_rows)
+    
+    fig_opt = px.line(optimization_df, x='Step', y='Loss', color='Learning Rate',
+                     title=f"{optimizer_type} on {problem_type}: median loss over {n_seeds} starts")
     fig_opt.update_layout(yaxis_type="log")
     st.plotly_chart(fig_opt, use_container_width=True)
     
     # Convergence metrics
-    final_loss = loss_curve[-1]
-    convergence_rate = (loss_curve[0] - loss_curve[-1]) / loss_curve[0]
-    
+    best_row = next(r for r in summary if r["Optimizer"] == optimizer_type)
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
-        st.metric("🎯 Final Loss", f"{final_loss:.4f}")
+        st.metric("🎯 Median Final Loss", f"{best_row['Median Final Loss']:.4g}")
     with col2:
-        st.metric("📉 Convergence Rate", f"{convergence_rate:.2%}")
+        steps_needed = best_row['Median Steps to Tolerance']
+        st.metric("📉 Steps to Tolerance", steps_needed if steps_needed is not None else "not reached",
+                  help=f"At the best learning rate ({best_row['Best Learning Rate']})")
     with col3:
-        st.metric("⏱️ Total Epochs", epochs)
+        st.metric("⏱️ Wall Time", f"{best_row['Wall Time (ms)']} ms",
+                  help=f"{best_row['Runs']} runs x {epochs} steps in one batched computation")
+
+def display_batch_scoring():
+    st.header("📦 Batch Scoring")
+    st.markdown("""
+    Stream a large CSV/Parquet file through a trained model in chunks and write the predictions to disk.
+    The same scoring runs without the UI: `python module/batch_scoring.py score <model> <input> <output>`.
+    """)
+    
+    models = batch_scoring.list_models()
+    labels = {f"{m['type']} → {m['target']} ({m['model']})": m for m in models}
+    choice = labels[st.selectbox("🤖 Model:", list(labels))]
+    st.caption(f"Expects the columns: {', '.join(choice['features'])}")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        uploaded = st.file_uploader("Input CSV or Parquet", type=["csv", "parquet"], key="scoring_upload")
+        input_path = st.text_input("...or an input file path on this server", key="scoring_path")
+    with col2:
+        output_format = st.radio("Output format:", ["Parquet", "CSV"], horizontal=True)
+        chunk_rows = st.select_slider("Chunk rows:", [10_000, 50_000, 100_000, 250_000, 500_000],
+                                      batch_scoring.SCORE_CHUNK_ROWS)
+    
+    scores_dir = batch_scoring.SCORES_DIR
+    if st.button("🚀 Score File"):
+        if uploaded:
+            # Uploads are spooled to disk so they stream through the same chunked reader as server paths
+            os.makedirs(scores_dir, exist_ok=True)
+            input_path = os.path.join(scores_dir, f"upload_{dataset_store.stream_fingerprint(uploaded)}_{uploaded.name}")
+            with open(input_path, "wb") as f:
+                f.write(uploaded.getbuffer())
+        if not input_path or not os.path.isfile(input_path):
+            st.error("Choose a file to upload or enter an existing path.")
+            return
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(scores_dir, f"{name}_scored.{output_format.lower()}")
+        progress = st.empty()
+        try:
+            stats = batch_scoring.score_file(
+                choice['model'], input_path, output_path, chunk_rows=chunk_rows, overwrite=True,
+                on_progress=lambda rows, seconds: progress.text(f"Scored {rows:,} rows ({rows / seconds:,.0f} rows/sec)"))
+        except Exception as e:
+            st.error(f"Scoring failed: {e}")
+            return
+        st.session_state.scoring_stats = stats
+    
+    stats = st.session_state.get('scoring_stats')
+    if stats:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📈 Rows Scored", f"{stats['rows']:,}")
+        col2.metric("⚡ Throughput", f"{stats['rows_per_sec'] or 0:,} rows/s")
+        col3.metric("⏱️ Time", f"{stats['seconds']}s")
+        st.caption(f"Model-only throughput: {stats['predict_rows_per_sec'] or 0:,} rows/s. "
+                   f"Written to `{stats['output']}` ({stats['output_bytes'] / 1024 ** 2:,.1f} MB).")
+        if stats['output_bytes'] <= 200 * 1024 ** 2 and os.path.exists(stats['output']):
+            with open(stats['output'], "rb") as f:
+                st.download_button("📥 Download Predictions", data=f.read(),
+                                   file_name=os.path.basename(stats['output']))
+    
+    with st.expander("🔌 Local HTTP Endpoint"):
+        st.write("Offline pipelines can `POST /score` with a JSON body `{\"model\", \"input\", \"output\"}` "
+                 f"or `GET /models`. Input and output paths must lie under `{scores_dir}`.")
+        port = st.number_input("Port:", 1024, 65535, 8765)
+        if st.button("▶️ Start Endpoint"):
+            try:
+                server = st.cache_resource(batch_scoring.serve)(port=int(port), background=True)
+            except OSError as e:
+                st.error(f"Could not start the endpoint: {e}")
+            else:
+                st.success(f"Listening on http://127.0.0.1:{server.server_port}")
+                st.code(f"Authorization: Bearer {server.token}")
+
 
 def run():
     # Custom CSS for better styling
@@ -441,27 +979,66 @@ def run():
             "🏷️ Encoding Analysis": "encoding",
             "⚙️ Model Init": "initialization",
             "🧠 AI Analytics": "analytics",
-            "⚡ Optimization": "optimization"
+            "⚡ Optimization": "optimization",
+            "📦 Batch Scoring": "scoring"
         }
         
         selected_section = st.radio("Choose Section:", list(sections.keys()))
         st.session_state.current_section = sections[selected_section]
         
+        st.markdown("---")
+        display_dataset_picker()
+        
         # Dataset info
         st.markdown("---")
         st.markdown("### 📊 Dataset Info")
-        df = create_enhanced_dataset()
-        st.metric("📈 Samples", len(df))
+        df, manifest = active_dataset()
+        st.metric("📈 Samples", f"{manifest['rows'] if manifest else len(df):,}")
         st.metric("📋 Features", len(df.columns))
         st.metric("🔍 Missing %", f"{(df.isnull().sum().sum() / df.size * 100):.1f}%")
+        if manifest and manifest['rows'] > len(df):
+            st.caption(f"Pages use a {len(df):,}-row sample of the memory-mapped dataset.")
     
     # Main content routing
-    if st.session_state.current_section == 'dashboard':
+    if st.session_state.current_section == 'dashboard' and manifest:
+        st.markdown(f"### 🎯 {manifest['name']}")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("📈 Rows", f"{manifest['rows']:,}")
+        col2.metric("📋 Columns", len(manifest['columns']))
+        col3.metric("💾 Arrow Cache", f"{manifest['arrow_bytes'] / 1024 ** 2:,.1f} MB")
+        col4.metric("⏱️ Ingest Time", f"{manifest['ingest_seconds']}s")
+        
+        st.markdown("### 📋 Dataset Preview")
+        st.dataframe(df.head(10), use_container_width=True)
+        st.markdown("### 🧬 Column Types")
+        st.dataframe(pd.DataFrame({
+            'Stored As': pd.Series(manifest['columns']),
+            'Missing %': (df.isnull().mean() * 100).round(2),
+        }), use_container_width=True)
+        
+        categorical_cols = categorical_columns(df)
+        numerical_cols = numeric_columns(df)
+        if categorical_cols:
+            col1, col2 = st.columns(2)
+            with col1:
+                counts = df[categorical_cols[0]].value_counts().reset_index()
+                counts.columns = [categorical_cols[0], 'Count']
+                st.plotly_chart(px.bar(counts, x=categorical_cols[0], y='Count',
+                                       title=f"{categorical_cols[0]} Distribution"), use_container_width=True)
+            if numerical_cols:
+                with col2:
+                    box_df = df[[categorical_cols[0], numerical_cols[0]]].dropna()
+                    if len(box_df) > SCATTER_ROWS:
+                        box_df = box_df.sample(SCATTER_ROWS, random_state=123)
+                    st.plotly_chart(px.box(box_df, x=categorical_cols[0], y=numerical_cols[0],
+                                           title=f"{numerical_cols[0]} by {categorical_cols[0]}"),
+                                    use_container_width=True)
+    
+    elif st.session_state.current_section == 'dashboard':
         # Dashboard overview
         st.markdown("### 🎯 Welcome to the Analytics Hub")
         
         # Quick stats
-        df = create_enhanced_dataset()
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -504,6 +1081,8 @@ def run():
         display_advanced_analytics()
     elif st.session_state.current_section == 'optimization':
         display_optimization_playground()
+    elif st.session_state.current_section == 'scoring':
+        display_batch_scoring()
 
 if __name__ == "__main__":
     run()
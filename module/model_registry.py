@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Fitted models are persisted here; override the location with DEVOPSAI_CACHE_DIR
+CACHE_DIR = os.environ.get("DEVOPSAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "devopsai"))
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+MEMORY_CAPACITY = 16
+DISK_CAPACITY = 64
+MODEL_TYPES = ["Random Forest", "Gradient Boosting", "Linear Model"]
+# Hyperparameters each model type accepts, with the (low, high, scale) ranges offered for sweeps
+PARAM_SPACES = {
+    "Random Forest": {"n_estimators": (10, 300, "int"), "max_depth": (2, 30, "int")},
+    "Gradient Boosting": {"n_estimators": (20, 400, "int"), "max_depth": (1, 8, "int"),
+                          "learning_rate": (0.01, 0.5, "log")},
+    "Linear Model": {"alpha": (1e-4, 100.0, "log")},
+}
+
+
+def model_key(dataset_hash, spec):
+    """Stable key for a fitted model: dataset content hash plus features, target, hyperparameters and seed."""
+    payload = json.dumps({"dataset": dataset_hash, **spec}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+
+def build_model(spec, n_jobs=1):
+    """Unfitted estimator for a spec; features are standardized first when spec['scale'] is set."""
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if spec["model_type"] not in PARAM_SPACES:
+        raise ValueError(f"Unknown model type '{spec['model_type']}'.")
+    params = {k: v for k, v in spec.get("params", {}).items() if k in PARAM_SPACES[spec["model_type"]]}
+    if spec["model_type"] == "Random Forest":
+        model = RandomForestRegressor(random_state=spec.get("seed"), n_jobs=n_jobs, **params)
+    elif spec["model_type"] == "Gradient Boosting":
+        model = GradientBoostingRegressor(random_state=spec.get("seed"), **params)
+    else:
+        model = Ridge(random_state=spec.get("seed"), **params)
+    return make_pipeline(StandardScaler(), model) if spec.get("scale") else model
+
+
+def train_and_evaluate(spec, X_train, y_train, X_eval, y_eval, n_jobs=1):
+    """Fits a spec and scores it on the evaluation rows; runs inside a worker process.
+
+    Returns (model, meta) where meta holds metrics, timings and the evaluation predictions.
+    """
+    import numpy as np
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    model = build_model(spec, n_jobs=n_jobs)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - started
+    predictions = model.predict(X_eval)
+    estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+    return model, {
+        "spec": spec,
+        "r2": float(r2_score(y_eval, predictions)),
+        "mse": float(mean_squared_error(y_eval, predictions)),
+        "train_seconds": round(train_seconds, 3),
+        "predictions": np.asarray(predictions, dtype=np.float32),
+        "feature_importances": getattr(estimator, "feature_importances_", None),
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class ModelRegistry:
+    """LRU cache of fitted models backed by joblib files, with training in a background process pool.
+
+    Lookups go memory -> disk; misses are submitted to the pool once, so repeated reruns with the
+    same inputs never train twice and the caller only polls the status.
+    """
+    def __init__(self, capacity=MEMORY_CAPACITY, disk_capacity=DISK_CAPACITY, model_dir=MODEL_DIR, max_workers=None):
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.model_dir = model_dir
+        self.max_workers = max_workers
+        os.makedirs(model_dir, exist_ok=True)
+        self.models = OrderedDict()
+        self.pending = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.pool = ProcessPoolExecutor(max_workers=max_workers)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "trained": 0, "evicted": 0}
+
+    def _path(self, key):
+        return os.path.join(self.model_dir, f"{key}.joblib")
+
+    def _remember(self, key, entry):
+        with self.lock:
+            self.models[key] = entry
+            self.models.move_to_end(key)
+            while len(self.models) > self.capacity:
+                self.models.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def get(self, key):
+        """(model, meta) if the model is in memory or on disk, else None."""
+        import joblib
+
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self.models[key]
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                entry = joblib.load(path)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                # Truncated or written by an incompatible library version; drop it so it is retrained
+                self._discard(key)
+                return None
+            os.utime(path)  # disk eviction is least-recently-used by mtime
+            with self.lock:
+                self.stats["disk_hits"] += 1
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def _discard(self, key):
+        for path in (self._path(key), os.path.join(self.model_dir, f"{key}.json")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _store(self, key, entry):
+        import joblib
+
+        tmp_path = f"{self._path(key)}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        # A small JSON sidecar lets other tools list models without unpickling them
+        _, meta = entry
+        with open(os.path.join(self.model_dir, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump({"key": key, "spec": meta["spec"], "r2": meta["r2"], "mse": meta["mse"],
+                       "trained_at": meta["trained_at"]}, f)
+        files = sorted((os.path.join(self.model_dir, f) for f in os.listdir(self.model_dir) if f.endswith(".joblib")),
+                       key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.disk_capacity)]:
+            self._discard(os.path.basename(path)[:-len(".joblib")])
+        self._remember(key, entry)
+
+    def _on_done(self, key, future):
+        # The entry is stored before leaving `pending`, so status() never reports a finished model as missing
+        try:
+            self._store(key, future.result())
+            with self.lock:
+                self.stats["trained"] += 1
+        except Exception as e:
+            with self.lock:
+                self.errors[key] = str(e)
+        with self.lock:
+            self.pending.pop(key, None)
+
+    def submit(self, key, spec, X_train, y_train, X_eval, y_eval, n_jobs=1):
+        """Starts training unless the model exists or is already training; returns the status."""
+        status = self.status(key)
+        if status != "missing":
+            return status
+        with self.lock:
+            try:
+                future = self.pool.submit(train_and_evaluate, spec, X_train, y_train, X_eval, y_eval, n_jobs)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory) and broke the pool; replace it so training continues
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                future = self.pool.submit(train_and_evaluate, spec, X_train, y_train, X_eval, y_eval, n_jobs)
+            self.pending[key] = future
+        future.add_done_callback(lambda f: self._on_done(key, f))
+        return "training"
+
+    def status(self, key):
+        """'ready', 'training', 'failed' or 'missing'."""
+        with self.lock:
+            if key in self.models:
+                return "ready"
+            if key in self.pending:
+                return "training"
+            if key in self.errors:
+                return "failed"
+        return "ready" if os.path.exists(self._path(key)) else "missing"
+
+    def error(self, key):
+        """Returns and clears the failure for a key, so the next submit retries it."""
+        with self.lock:
+            return self.errors.pop(key, None)
+
+    def telemetry(self):
+        with self.lock:
+            return dict(self.stats, in_memory=len(self.models), training=len(self.pending))
+
+
+def list_models(model_dir=MODEL_DIR):
+    """Sidecar metadata of every persisted model, newest first."""
+    if not os.path.isdir(model_dir):
+        return []
+    models = []
+    for entry in os.listdir(model_dir):
+        if entry.endswith(".json") and os.path.exists(os.path.join(model_dir, entry[:-5] + ".joblib")):
+            with open(os.path.join(model_dir, entry), "r", encoding="utf-8") as f:
+                models.append(json.load(f))
+    return sorted(models, key=lambda m: m["trained_at"], reverse=True)
+
+
+# --- Hyperparameter Sweeps ---
+
+_sweep_data = {}
+
+
+def sample_configs(space, mode="random", n_configs=50, grid_steps=4, seed=0):
+    """Parameter dicts from {name: (low, high, scale)}: a full grid, or n_configs random draws."""
+    import itertools
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+
+    def values(low, high, scale, n):
+        if scale == "log":
+            points = np.exp(np.linspace(np.log(low), np.log(high), n) if n else rng.uniform(np.log(low), np.log(high)))
+        else:
+            points = np.linspace(low, high, n) if n else rng.uniform(low, high)
+        return np.round(points).astype(int) if scale == "int" else np.round(points, 6)
+
+    if mode == "grid":
+        axes = {name: sorted(set(values(*bounds, grid_steps).tolist())) for name, bounds in space.items()}
+        return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+    configs = []
+    for _ in range(n_configs):
+        configs.append({name: values(*bounds, 0).item() for name, bounds in space.items()})
+    return configs
+
+
+def _init_sweep_worker(X, y):
+    _sweep_data["X"], _sweep_data["y"] = X, y
+
+
+def _score_fold(spec, n_rows, fold, n_folds, seed):
+    """One CV fold on the first n_rows of a seeded shuffle of the worker's dataset."""
+    import numpy as np
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    X, y = _sweep_data["X"], _sweep_data["y"]
+    rows = np.random.default_rng(seed).permutation(len(X))[:n_rows]
+    test = np.arange(len(rows)) % n_folds == fold
+    started = time.perf_counter()
+    model = build_model(spec).fit(X[rows[~test]], y[rows[~test]])
+    predictions = model.predict(X[rows[test]])
+    return (r2_score(y[rows[test]], predictions), mean_squared_error(y[rows[test]], predictions),
+            time.perf_counter() - started)
+
+
+def halving_schedule(n_configs, n_rows, eta=3, min_rows=100):
+    """Row budgets per rung for successive halving: the last rung uses every row."""
+    # Largest r with eta ** r <= n_configs, counted exactly (float logs round 243 / 3 down to 4 rungs)
+    rungs = 0
+    while eta > 1 and eta ** (rungs + 1) <= n_configs:
+        rungs += 1
+    budgets = [max(min_rows, int(n_rows / eta ** (rungs - r))) for r in range(rungs + 1)]
+    return sorted(set(min(b, n_rows) for b in budgets))
+
+
+def run_sweep(base_spec, configs, X, y, n_folds=5, halving=True, eta=3, max_workers=None, seed=0):
+    """Cross-validates every config in a process pool; yields (leaderboard, finished, total) as fold results arrive.
+
+    With halving, each rung scores the surviving configs on a larger row sample and only the best
+    1/eta advance, so poor configurations stop early. Folds of all configs in a rung run in parallel.
+    """
+    from concurrent.futures import as_completed
+
+    import numpy as np
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    budgets = halving_schedule(len(configs), len(X), eta, min_rows=n_folds * 20) if halving else [len(X)]
+    board = {i: {"Config": i + 1, **params, "Rung": 0, "Rows": 0, "CV R²": None, "R² Std": None, "CV MSE": None,
+                 "Fit Time (s)": 0.0, "Status": "queued"} for i, params in enumerate(configs)}
+    alive = list(board)
+    total = len(configs) * n_folds * len(budgets)
+    finished = 0
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=(X, y))
+    try:
+        for rung, rows in enumerate(budgets):
+            folds = {i: [] for i in alive}
+            futures = {}
+            for i in alive:
+                spec = dict(base_spec, params=configs[i])
+                board[i].update(Rung=rung + 1, Rows=rows, Status="running")
+                for fold in range(n_folds):
+                    futures[pool.submit(_score_fold, spec, rows, fold, n_folds, seed)] = i
+            for future in as_completed(futures):
+                i = futures[future]
+                finished += 1
+                try:
+                    folds[i].append(future.result())
+                except Exception as e:
+                    board[i]["Status"] = f"failed: {e}"
+                    continue
+                scores = np.array(folds[i])
+                board[i].update({"CV R²": round(float(scores[:, 0].mean()), 4),
+                                 "R² Std": round(float(scores[:, 0].std()), 4),
+                                 "CV MSE": round(float(scores[:, 1].mean()), 4),
+                                 "Fit Time (s)": round(float(scores[:, 2].sum()), 3)})
+                if len(folds[i]) == n_folds and not board[i]["Status"].startswith("failed"):
+                    board[i]["Status"] = "scored"
+                yield leaderboard(board), finished, total
+            scored = sorted((i for i in alive if board[i]["Status"] == "scored"), key=lambda i: -board[i]["CV R²"])
+            if rung < len(budgets) - 1:
+                keep = max(1, len(scored) // eta)
+                for i in scored[keep:]:
+                    board[i]["Status"] = f"stopped at rung {rung + 1}"
+                alive = scored[:keep]
+                # Work for the stopped configurations is skipped, not performed
+                total = finished + len(alive) * n_folds * (len(budgets) - rung - 1)
+            else:
+                for i in scored:
+                    board[i]["Status"] = "finished"
+        yield leaderboard(board), total, total
+    finally:
+        # Streamlit closes this generator when a rerun interrupts the sweep; queued folds are cancelled
+        # instead of blocking the session until every one of them has run
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def leaderboard(board):
+    """Rows ordered by rung reached, then cross-validated R² (best first)."""
+    return sorted(board.values(), key=lambda r: (-r["Rung"], -(r["CV R²"] if r["CV R²"] is not None else float("-inf"))))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Pages import their helper modules as top-level modules, the same way app.py loads them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module"))
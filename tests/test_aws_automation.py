@@ -0,0 +1,146 @@
+import threading
+
+import aws_automation
+
+
+def test_catalog_exact_lookups_ignore_partial_matches(tmp_path):
+    catalog = aws_automation.CatalogStore(path=str(tmp_path / "catalog.db"))
+    with catalog._connect() as conn:
+        # The newer AMI mentions the older one's id, so a LIKE search returns it first
+        conn.executemany("INSERT INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+            ("us-east-1", "ami-2", "copy", "copied from ami-1", "self", "x86_64", "Linux/UNIX", "2030-01-01"),
+            ("us-east-1", "ami-1", "base", "", "self", "x86_64", "Linux/UNIX", "2020-01-01"),
+        ])
+        conn.executemany("INSERT INTO instance_types VALUES (?, ?, ?, ?, ?, ?)", [
+            ("us-east-1", "t3.micro", 2, 1024, "x86_64", 1),
+            ("us-east-1", "t3.medium", 2, 4096, "x86_64", 1),
+        ])
+
+    assert catalog.get_image("us-east-1", "ami-1")["Name"] == "base"
+    assert catalog.get_image("us-west-2", "ami-1") is None
+    assert catalog.get_instance_type("us-east-1", "t3.medium")["Memory (GiB)"] == 4.0
+    assert catalog.get_instance_type("us-east-1", "t3") is None
+
+
+class InsufficientCapacity(Exception):
+    pass
+
+
+class FakeEC2:
+    """Stand-in for the EC2 client: each subnet has a fixed number of free slots."""
+
+    def __init__(self, capacity=None, fleet_response=None):
+        self.capacity = capacity or {}
+        self.fleet_response = fleet_response or {}
+        self.calls = []
+        self.launched = 0
+        self.lock = threading.Lock()
+
+    def run_instances(self, **params):
+        with self.lock:
+            self.calls.append(params)
+            free = self.capacity.get(params.get("SubnetId"), params["MaxCount"])
+            if free < params["MinCount"]:
+                raise InsufficientCapacity(f"only {free} of {params['MinCount']} available")
+            started = min(free, params["MaxCount"])
+            ids = [f"i-{self.launched + n:04d}" for n in range(started)]
+            self.launched += started
+        return {"Instances": [{"InstanceId": i} for i in ids]}
+
+    def create_fleet(self, **request):
+        self.calls.append(request)
+        return self.fleet_response
+
+
+def test_fleet_splits_count_across_subnets():
+    ec2 = FakeEC2()
+
+    ids, errors = aws_automation.launch_fleet(ec2, 10, subnet_ids=["subnet-a", "subnet-b", "subnet-c"],
+                                              image_id="ami-1", instance_type="t3.micro", tags={"Name": "web"})
+
+    assert (len(ids), errors) == (10, [])
+    shares = sorted((c["SubnetId"], c["MinCount"], c["MaxCount"]) for c in ec2.calls)
+    assert shares == [("subnet-a", 1, 4), ("subnet-b", 1, 3), ("subnet-c", 1, 3)]
+    assert ec2.calls[0]["TagSpecifications"] == [
+        {"ResourceType": "instance", "Tags": [{"Key": "Name", "Value": "web"}]}]
+
+
+def test_fleet_without_subnets_uses_one_call_in_the_default_subnet():
+    ec2 = FakeEC2()
+
+    ids, errors = aws_automation.launch_fleet(ec2, 5, image_id="ami-1", allow_partial=False)
+
+    assert (len(ids), errors) == (5, [])
+    assert len(ec2.calls) == 1
+    assert "SubnetId" not in ec2.calls[0]
+    assert (ec2.calls[0]["MinCount"], ec2.calls[0]["MaxCount"]) == (5, 5)
+
+
+def test_fleet_partial_capacity():
+    capacity = {"subnet-a": 2, "subnet-b": 5}
+
+    ids, errors = aws_automation.launch_fleet(FakeEC2(capacity), 10, subnet_ids=list(capacity), image_id="ami-1")
+    assert (len(ids), errors) == (7, [])
+
+    ids, errors = aws_automation.launch_fleet(FakeEC2(capacity), 10, subnet_ids=list(capacity), image_id="ami-1",
+                                              allow_partial=False)
+    assert len(ids) == 5
+    assert errors == ["subnet-a: only 2 of 5 available"]
+
+
+def test_fleet_failed_subnet_does_not_block_the_others():
+    capacity = {"subnet-a": 0, "subnet-b": 3, "subnet-c": 3}
+
+    ids, errors = aws_automation.launch_fleet(FakeEC2(capacity), 6, subnet_ids=list(capacity), image_id="ami-1")
+
+    assert len(ids) == 4
+    assert errors == ["subnet-a: only 0 of 1 available"]
+
+
+def test_ec2_fleet_reports_errors_and_needs_a_template():
+    assert aws_automation.launch_fleet(FakeEC2(), 3, use_ec2_fleet=True) == \
+        ([], ["EC2 Fleet requires a launch template."])
+
+    ec2 = FakeEC2(fleet_response={
+        "Instances": [{"InstanceIds": ["i-1", "i-2"]}],
+        "Errors": [{"ErrorCode": "InsufficientInstanceCapacity", "ErrorMessage": "subnet-b is full"}],
+    })
+    template = {"LaunchTemplateName": "web"}
+
+    ids, errors = aws_automation.launch_fleet(ec2, 3, subnet_ids=["subnet-a", "subnet-b"], instance_type="t3.micro",
+                                              launch_template=template, use_ec2_fleet=True)
+
+    assert ids == ["i-1", "i-2"]
+    assert errors == ["InsufficientInstanceCapacity: subnet-b is full"]
+    (request,) = ec2.calls
+    assert request["Type"] == "instant"
+    assert request["TargetCapacitySpecification"]["TotalTargetCapacity"] == 3
+    assert request["LaunchTemplateConfigs"] == [{
+        "LaunchTemplateSpecification": template,
+        "Overrides": [{"SubnetId": "subnet-a", "InstanceType": "t3.micro"},
+                      {"SubnetId": "subnet-b", "InstanceType": "t3.micro"}],
+    }]
+
+
+def test_bulk_plan_skips_instances_already_in_the_target_state():
+    rows = [{"InstanceId": f"i-{n}", "Region": region, "State": state}
+            for n, (region, state) in enumerate([("us-east-1", "running"), ("us-east-1", "stopped"),
+                                                 ("eu-west-1", "running"), ("eu-west-1", "terminated")])]
+
+    assert aws_automation.plan_bulk_action(rows, "stop") == [("eu-west-1", ["i-2"]), ("us-east-1", ["i-0"])]
+    assert aws_automation.plan_bulk_action(rows, "start") == [("us-east-1", ["i-1"])]
+    assert aws_automation.plan_bulk_action(rows, "retag") == [("eu-west-1", ["i-2"]), ("us-east-1", ["i-0", "i-1"])]
+
+
+def test_catalog_search_matches_wildcard_characters_literally(tmp_path):
+    catalog = aws_automation.CatalogStore(path=str(tmp_path / "catalog.db"))
+    with catalog._connect() as conn:
+        conn.executemany("INSERT INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+            ("us-east-1", "ami-1", "web_v2", "", "self", "x86_64", "Linux/UNIX", "2024-01-01"),
+            ("us-east-1", "ami-2", "webXv2", "100% tested", "self", "x86_64", "Linux/UNIX", "2024-01-02"),
+        ])
+
+    assert [i["ImageId"] for i in catalog.search_images("us-east-1", "web_v")] == ["ami-1"]
+    assert [i["ImageId"] for i in catalog.search_images("us-east-1", "0% t")] == ["ami-2"]
+    assert [i["ImageId"] for i in catalog.search_images("us-east-1", "%")] == ["ami-2"]
+    assert catalog.search_instance_types("us-east-1", text="_") == []
@@ -0,0 +1,133 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("sklearn")
+
+import batch_scoring
+import model_registry
+
+
+@pytest.fixture
+def model_key(tmp_path, monkeypatch):
+    import joblib
+    from sklearn.linear_model import Ridge
+
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path / "models"))
+    batch_scoring._load_registry_model.cache_clear()
+    os.makedirs(model_registry.MODEL_DIR)
+    X = pd.DataFrame({"a": [0.0, 1.0, 2.0, 3.0], "b": [1.0, 0.0, 1.0, 0.0]})
+    model = Ridge(alpha=0.0).fit(X, 2 * X["a"] + X["b"])
+    joblib.dump((model, {"spec": {"features": ["a", "b"]}}), os.path.join(model_registry.MODEL_DIR, "0a1b2c.joblib"))
+    yield "0a1b2c"
+    batch_scoring._load_registry_model.cache_clear()
+
+
+def write_input(path, rows=20):
+    # The passthrough id is numeric in the first chunk and alphanumeric in the second
+    ids = [str(i) for i in range(rows // 2)] + [f"x{i}" for i in range(rows // 2)]
+    pd.DataFrame({"id": ids, "a": range(rows), "b": [1.0] * rows}).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_passthrough_type_change_between_chunks(tmp_path, model_key, suffix):
+    write_input(tmp_path / "in.csv")
+    output = str(tmp_path / f"out{suffix}")
+
+    stats = batch_scoring.score_file(model_key, str(tmp_path / "in.csv"), output, chunk_rows=5)
+
+    scored = pd.read_parquet(output) if suffix == ".parquet" else pd.read_csv(output, dtype={"id": str})
+    assert stats["rows"] == 20
+    assert scored["id"].tolist()[-1] == "x9"
+    assert scored["Prediction"].round(6).tolist() == [2.0 * a + 1.0 for a in range(20)]
+
+
+def test_refuses_to_overwrite_and_leaves_no_temp_files(tmp_path, model_key):
+    write_input(tmp_path / "in.csv")
+    (tmp_path / "out.csv").write_text("keep")
+
+    with pytest.raises(FileExistsError):
+        batch_scoring.score_file(model_key, str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+
+    assert (tmp_path / "out.csv").read_text() == "keep"
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+@pytest.fixture
+def endpoint(tmp_path, model_key):
+    root = tmp_path / "scores"
+    server = batch_scoring.serve(port=0, token="secret", root=str(root), background=True)
+    write_input(root / "in.csv")
+    yield f"http://127.0.0.1:{server.server_port}", root
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body, headers):
+    request = urllib.request.Request(f"{url}/score", data=json.dumps(body).encode(), headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+AUTH = {"Authorization": "Bearer secret", "Content-Type": "application/json"}
+
+
+def test_endpoint_scores_inside_root(endpoint, model_key):
+    url, root = endpoint
+    status, stats = post(url, {"model": model_key, "input": "in.csv", "output": "out/in.parquet"}, AUTH)
+    assert status == 200
+    assert stats["rows"] == 20
+    assert (root / "out" / "in.parquet").exists()
+
+
+@pytest.mark.parametrize("headers,expected", [
+    ({"Content-Type": "application/json"}, 401),
+    ({"Authorization": "Bearer wrong", "Content-Type": "application/json"}, 401),
+    ({"Authorization": "Bearer secret", "Content-Type": "text/plain"}, 415),
+])
+def test_endpoint_requires_token_and_json(endpoint, model_key, headers, expected):
+    url, root = endpoint
+    status, _ = post(url, {"model": model_key, "input": "in.csv", "output": "out.csv"}, headers)
+    assert status == expected
+    assert not (root / "out.csv").exists()
+
+
+def test_endpoint_rejects_paths_outside_root_and_existing_outputs(endpoint, model_key, tmp_path):
+    url, root = endpoint
+    (root / "taken.csv").write_text("keep")
+
+    status, _ = post(url, {"model": model_key, "input": "in.csv", "output": str(tmp_path / "escape.csv")}, AUTH)
+    assert status == 400
+    status, _ = post(url, {"model": model_key, "input": "../scores/../in.csv", "output": "x.csv"}, AUTH)
+    assert status == 400
+    status, _ = post(url, {"model": model_key, "input": "in.csv", "output": "taken.csv"}, AUTH)
+    assert status == 409
+
+    assert not (tmp_path / "escape.csv").exists()
+    assert (root / "taken.csv").read_text() == "keep"
+
+
+def test_endpoint_rejects_model_ids_outside_the_registry(endpoint, model_key, tmp_path):
+    import joblib
+
+    url, root = endpoint
+    # A loadable pickle outside MODEL_DIR must never be reached through the model id
+    joblib.dump(("not a model", {}), tmp_path / "outside.joblib")
+
+    for model in ("../outside", "../../" + str(tmp_path / "outside"), ["0a1b2c"]):
+        assert post(url, {"model": model, "input": "in.csv", "output": "out.csv"}, AUTH)[0] == 400
+    assert not (root / "out.csv").exists()
+
+
+@pytest.mark.parametrize("body", [["in.csv"], "in.csv", 3])
+def test_endpoint_rejects_bodies_that_are_not_objects(endpoint, body):
+    url, _ = endpoint
+    assert post(url, body, AUTH)[0] == 400
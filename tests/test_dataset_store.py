@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import dataset_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "DATASET_DIR", str(tmp_path / "datasets"))
+    return tmp_path
+
+
+def test_column_numeric_then_text_keeps_every_value(store):
+    codes = [str(i) for i in range(10)] + [f"X{i}" for i in range(10)]
+    path = store / "mixed.csv"
+    pd.DataFrame({"code": codes, "value": range(20)}).to_csv(path, index=False)
+
+    manifest = dataset_store.ingest(str(path), "mixed.csv", chunk_rows=10)
+    frame = dataset_store.load_frame(manifest["key"])
+
+    assert manifest["columns"]["code"] == "string"
+    assert frame["code"].isna().sum() == 0
+    assert frame["code"].tolist() == codes
+
+
+def test_low_cardinality_text_becomes_category(store):
+    path = store / "colors.csv"
+    pd.DataFrame({"color": ["red", "blue"] * 10, "value": range(20)}).to_csv(path, index=False)
+
+    manifest = dataset_store.ingest(str(path), "colors.csv", chunk_rows=10)
+    frame = dataset_store.load_frame(manifest["key"])
+
+    assert manifest["columns"] == {"color": "category", "value": "uint8"}
+    assert frame["color"].astype(str).tolist() == ["red", "blue"] * 10
+
+
+def test_text_column_empty_in_the_first_chunk(store):
+    notes = [None] * 10 + [f"note {i}" for i in range(30)]
+    path = store / "sparse.csv"
+    pd.DataFrame({"note": notes, "value": [0.5] * 40}).to_csv(path, index=False)
+
+    manifest = dataset_store.ingest(str(path), "sparse.csv", chunk_rows=10)
+    frame = dataset_store.load_frame(manifest["key"])
+
+    assert manifest["columns"] == {"note": "string", "value": "float32"}
+    assert frame["note"].isna().sum() == 10
+    assert frame["note"].tolist()[10:] == notes[10:]
@@ -0,0 +1,254 @@
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import git_automation
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    (path / "with space.txt").write_text("hello\n")
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "first")
+    return path
+
+
+def test_object_store_missing_paths_with_spaces_raise_key_error(repo):
+    store = git_automation.GitObjectStore(str(repo))
+    try:
+        assert store.info("HEAD:with space.txt")[1:] == ("blob", 6)
+        for spec in ("HEAD:no such.txt", "HEAD:a b c", "no-such-ref"):
+            with pytest.raises(KeyError):
+                store.info(spec)
+        # The pipes stay in sync after a failed lookup
+        assert store.read("HEAD:with space.txt")[3] == b"hello\n"
+    finally:
+        store.close()
+
+
+def commit(repo, files, author="Ann", message="change"):
+    for name, text in files.items():
+        (repo / name).write_text(text)
+    git(repo, "add", ".")
+    git(repo, "-c", f"user.name={author}", "commit", "-q", "-m", message)
+
+
+def index_totals(index):
+    data, meta = index.columns()
+    return {"commits": len(data["commits"]["time"]), "changes": len(data["changes"]["file"]),
+            "authors": {row["Author"]: row["Commits"] for row in index.author_activity()},
+            "churn": {row["File"]: row["Churn"] for row in index.hotspots()}}
+
+
+def test_commit_index_appends_only_new_commits(repo, tmp_path):
+    index = git_automation.CommitIndex(str(repo), index_dir=str(tmp_path / "index"))
+    assert index.update() == 1
+    assert index.update() == 0
+
+    commit(repo, {"a.txt": "1\n2\n"}, author="Bob")
+    commit(repo, {"a.txt": "1\n", "b.txt": "x\n"})
+    assert index.update() == 2
+
+    fresh = git_automation.CommitIndex(str(repo), index_dir=str(tmp_path / "fresh"))
+    fresh.update()
+    assert index_totals(index) == index_totals(fresh) == {
+        "commits": 3, "changes": 4, "authors": {"Test": 1, "Bob": 1, "Ann": 1},
+        "churn": {"with space.txt": 1, "a.txt": 3, "b.txt": 1}}
+
+
+def test_commit_index_rebuilds_after_a_history_rewrite(repo, tmp_path):
+    index = git_automation.CommitIndex(str(repo), index_dir=str(tmp_path / "index"))
+    commit(repo, {"a.txt": "1\n"})
+    index.update()
+
+    git(repo, "commit", "-q", "--amend", "-m", "reworded")
+    assert index.update() == 2
+    assert index_totals(index)["commits"] == 2
+
+
+def test_commit_index_drops_rows_from_an_unfinished_update(repo, tmp_path):
+    index = git_automation.CommitIndex(str(repo), index_dir=str(tmp_path / "index"))
+    index.update()
+    # An update that died after appending some columns but before writing meta.json
+    with open(index._path("commits", "time"), "ab") as f:
+        f.write(b"\x01" * 8 * 5)
+    with open(index._path("changes", "file"), "ab") as f:
+        f.write(b"\x02" * 4 * 3)
+
+    assert index_totals(index)["commits"] == 1
+    commit(repo, {"a.txt": "1\n"})
+    assert index.update() == 1
+
+    data, meta = index.columns()
+    assert meta["commits"] == 2 and meta["changes"] == 2
+    assert [len(column) for column in data["commits"].values()] == [2] * 5
+    assert [len(column) for column in data["changes"].values()] == [2] * 4
+    assert os.path.getsize(index._path("commits", "time")) == 2 * 8
+
+
+@pytest.mark.parametrize("pattern,literals", [
+    ("foo.*bar", ["foo", "bar"]),
+    ("colou?r", ["colo", "r"]),
+    (r"def \w+\(", ["def ", "("]),
+    (r"1\.5", ["1.5"]),
+    ("(abc)def", ["def"]),
+    ("ab{2}cd", ["a", "cd"]),
+    ("get|set", []),
+    (r"\x41BC", []),
+    (r"caf\u00e9", []),
+    ("(?x)ab cd", []),
+    ("(?#note)abc", []),
+    ("[", []),
+])
+def test_required_literals(pattern, literals):
+    assert git_automation.required_literals(pattern) == literals
+
+
+SEARCH_FILES = {
+    "app.py": "def handler(event):\n    return colour_for(event)\n",
+    "util.py": "VERSION = 1.5\ncolor = 'ABC'\n",
+    "notes.md": "Café au lait\nuse get or set\n# TODO(ann): fix\n",
+}
+
+
+@pytest.mark.parametrize("query", [
+    "colou?r", r"def \w+\(", r"1\.5", "get|set", r"\x41BC", r"Caf\u00e9", "(?x) C a f é", r"TODO\(\w+\)", "[Cc]af",
+])
+def test_trigram_search_never_misses_a_match(repo, query):
+    commit(repo, SEARCH_FILES)
+    search = git_automation.WorkspaceSearch()
+    search.update([str(repo)])
+
+    results, total = search.search({"repo": str(repo)}, query, use_regex=True, case_sensitive=True)
+
+    regex = re.compile(query, re.MULTILINE)
+    expected = sorted(name for name, text in SEARCH_FILES.items() if regex.search(text))
+    assert expected
+    assert sorted(r["path"] for r in results) == expected
+
+
+def test_workspace_search_only_rescans_stale_checkouts(repo):
+    search = git_automation.WorkspaceSearch()
+    assert search.update([str(repo)]) == {str(repo): (1, 0)}
+    commit(repo, {"new.txt": "fresh text\n"})
+
+    assert search.update([str(repo)], max_age=60) == {}
+    assert search.search({"repo": str(repo)}, "fresh text")[1] == 0
+    assert search.update([str(repo)]) == {str(repo): (1, 0)}
+    assert search.search({"repo": str(repo)}, "fresh text")[1] == 1
+
+
+REPOS = [
+    {"name": "old-service", "pushed_at": "2020-01-01T00:00:00Z", "size": 4096},
+    {"name": "Old-Docs", "pushed_at": "2020-06-01T00:00:00Z", "size": 100, "archived": True},
+    {"name": "old-new", "pushed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "size": 10},
+    {"name": "api", "pushed_at": "2020-01-01T00:00:00Z", "size": 20480},
+]
+
+
+def test_select_and_plan_repositories():
+    selected = git_automation.select_repositories(REPOS, "old-*", pushed_before_days=365)
+    assert [r["name"] for r in selected] == ["old-service"]
+    selected = git_automation.select_repositories(REPOS, "OLD-*", pushed_before_days=365, include_archived=True)
+    assert [r["name"] for r in selected] == ["Old-Docs", "old-service"]
+    assert [r["name"] for r in git_automation.select_repositories(REPOS, min_size_mb=10)] == ["api"]
+
+    plan = git_automation.plan_repo_action(selected, "octo", "Archive")
+    assert [row["Request"] for row in plan] == ["PATCH /repos/octo/Old-Docs", "PATCH /repos/octo/old-service"]
+    assert plan[1]["Size (MB)"] == 4.0
+
+
+class FakeGitHub:
+    """Stand-in for GitHubClient.request: records calls and fails the repositories it is told to."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def request(self, method, path, json=None):
+        with self.lock:
+            self.calls.append((method, path, json))
+        if path.rsplit("/", 1)[1] in self.failing:
+            return False, "Must have admin rights to Repository."
+        return True, {}
+
+
+def test_run_repo_action_reports_each_repository():
+    client = FakeGitHub(failing={"b"})
+
+    results = git_automation.run_repo_action(client, "octo", ["a", "b", "c"], "Archive", per_minute=6000)
+
+    assert sorted(client.calls) == [("PATCH", f"/repos/octo/{name}", {"archived": True}) for name in "abc"]
+    assert [(r["Repository"], r["Result"]) for r in results] == [
+        ("a", "ok"), ("b", "failed: Must have admin rights to Repository."), ("c", "ok")]
+
+
+def test_run_repo_action_paces_request_starts():
+    client = FakeGitHub()
+    started = time.monotonic()
+
+    git_automation.run_repo_action(client, "octo", ["a", "b", "c"], "Delete", max_workers=3, per_minute=600)
+
+    # Three starts 0.1s apart, however many workers are free
+    assert time.monotonic() - started >= 0.2
+    assert {call[0] for call in client.calls} == {"DELETE"}
+
+
+@pytest.fixture
+def github_stub(tmp_path):
+    """Local HTTP stand-in for the GitHub API; GITHUB_API_URL (or base_url) points the client at it."""
+    pytest.importorskip("requests")
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _handle(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            requests_seen.append((self.command, self.path, json.loads(body) if body else None,
+                                  self.headers.get("Authorization")))
+            if self.path.endswith("/locked"):
+                payload = json.dumps({"message": "Repository is locked"}).encode()
+                self.send_response(403)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            else:
+                self.send_response(204)
+                self.end_headers()
+
+        do_PATCH = do_DELETE = _handle
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = git_automation.GitHubClient("t0ken", base_url=f"http://127.0.0.1:{server.server_port}",
+                                         cache_dir=str(tmp_path / "github"))
+    yield client, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_repo_action_through_the_github_client(github_stub):
+    client, requests_seen = github_stub
+
+    results = git_automation.run_repo_action(client, "octo", ["tool", "locked"], "Archive", per_minute=6000)
+
+    assert [r["Result"] for r in results] == ["ok", "failed: Repository is locked"]
+    assert sorted(requests_seen) == [("PATCH", "/repos/octo/locked", {"archived": True}, "token t0ken"),
+                                     ("PATCH", "/repos/octo/tool", {"archived": True}, "token t0ken")]
@@ -0,0 +1,81 @@
+import threading
+from collections import deque
+from types import SimpleNamespace as NS
+
+import pytest
+
+pytest.importorskip("yaml")
+
+import kubernetes_dashboard
+
+
+def test_load_manifests_skips_documents_that_are_not_mappings(tmp_path):
+    (tmp_path / "app.yaml").write_text(
+        "apiVersion: v1\nkind: List\nitems:\n- apiVersion: v1\n  kind: ConfigMap\n  metadata: {name: a}\n- just text\n"
+        "---\n- a\n- list\n")
+    bundle = "apiVersion: v1\nkind: Namespace\nmetadata: {name: web}\n---\nhello\n---\n"
+
+    objects, errors = kubernetes_dashboard.load_manifests(bundle, str(tmp_path))
+
+    assert [o["kind"] for o in objects] == ["Namespace", "ConfigMap"]
+    assert errors == [
+        "bundle, document 2: expected a mapping, got str",
+        f"{tmp_path / 'app.yaml'}, document 1, item 2: expected a mapping, got str",
+        f"{tmp_path / 'app.yaml'}, document 2: expected a mapping, got list",
+    ]
+
+
+def test_applied_object_is_unchanged_only_when_equal_and_owned():
+    live = {"kind": "ConfigMap", "data": {"a": "1"},
+            "metadata": {"name": "c", "resourceVersion": "7",
+                         "managedFields": [{"manager": "kubectl", "operation": "Apply"}]}}
+    applied = dict(live, metadata=dict(live["metadata"], resourceVersion="8"))
+
+    assert kubernetes_dashboard._comparable(applied) == kubernetes_dashboard._comparable(live)
+    assert not kubernetes_dashboard.owns_fields(live, "devopsai-dashboard")
+    assert kubernetes_dashboard.owns_fields(live, "kubectl")
+
+
+def bare_monitor():
+    """A RolloutMonitor without its watch threads, for driving the handlers directly."""
+    monitor = object.__new__(kubernetes_dashboard.RolloutMonitor)
+    monitor.name, monitor.namespace = "web", "default"
+    monitor.pods, monitor.replicasets, monitor._pod_state, monitor._versions = {}, {}, {}, {}
+    monitor.timeline = deque()
+    monitor.lock = threading.Lock()
+    return monitor
+
+
+def pod(name, version="1"):
+    return NS(metadata=NS(name=name, uid=f"uid-{name}", resource_version=version),
+              status=NS(phase="Running", conditions=[]))
+
+
+def event(name, version="1"):
+    return NS(metadata=NS(name=name, uid=f"uid-{name}", resource_version=version, creation_timestamp=None),
+              involved_object=NS(name="web", kind="Deployment"), reason="ScalingReplicaSet", message=name,
+              last_timestamp=None, event_time=None)
+
+
+def listing(*items):
+    return lambda namespace, **kwargs: NS(items=list(items), metadata=NS(resource_version="100"))
+
+
+def test_relist_drops_pods_deleted_during_the_gap():
+    monitor = bare_monitor()
+    for name in ("a", "b"):
+        monitor._handle(monitor._on_pod, "ADDED", pod(name))
+
+    assert monitor._relist("pod", listing(pod("b"), pod("c")), {}) == "100"
+    assert sorted(monitor.pods) == ["b", "c"]
+
+
+def test_relist_does_not_record_already_seen_objects_again():
+    monitor = bare_monitor()
+    monitor._handle(monitor._on_event, "ADDED", event("scaled-up"))
+
+    monitor._relist("event", listing(event("scaled-up"), event("scaled-down")), {})
+    monitor._relist("event", listing(event("scaled-up"), event("scaled-down")), {})
+
+    assert [row["Message"] for row in monitor.timeline] == [
+        "ScalingReplicaSet: scaled-up", "ScalingReplicaSet: scaled-down"]
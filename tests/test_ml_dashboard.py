@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("sklearn")
+
+import ml_dashboard
+
+
+def sparse_values(rows=400, cols=6, seed=0):
+    """Every row misses at least one column, so no row is complete."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, cols))
+    values[np.arange(rows), rng.integers(0, cols, rows)] = np.nan
+    return values
+
+
+def test_pattern_knn_needs_no_complete_rows():
+    values = sparse_values()
+
+    filled = ml_dashboard.transform_pattern_knn(values, *ml_dashboard.fit_pattern_knn(values), n_neighbors=5)
+
+    assert not np.isnan(filled).any()
+    observed = ~np.isnan(values)
+    assert np.array_equal(filled[observed], values[observed])
+
+
+def test_pattern_knn_falls_back_to_column_means():
+    values = np.array([[1.0, np.nan], [3.0, np.nan], [np.nan, np.nan]])
+
+    filled = ml_dashboard.transform_pattern_knn(values, *ml_dashboard.fit_pattern_knn(values))
+
+    # Column 1 has no donors and no observed value at all; the all-missing row takes column means
+    assert filled.tolist() == [[1.0, 0.0], [3.0, 0.0], [2.0, 0.0]]
+
+
+@pytest.mark.parametrize("method", ["KNN (k=5)", "Iterative (MICE)"])
+def test_large_data_imputation_keeps_empty_reference_columns(method, monkeypatch):
+    monkeypatch.setattr(ml_dashboard, "REFERENCE_SAMPLE_ROWS", 100)
+    values = sparse_values(rows=300, cols=4)
+    values[:, 3] = np.nan
+    frame = pd.DataFrame(values, columns=list("abcd"))
+
+    imputed, _ = ml_dashboard.fit_imputation.__wrapped__(method, method, True, frame)
+
+    assert list(imputed.columns) == list("abcd")
+    assert not imputed[list("abc")].isna().any().any()